@@ -1,14 +1,48 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session,jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session,jsonify, g, has_app_context
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
 from flask_bcrypt import Bcrypt
+import bcrypt as bcrypt_lib
 from flask_wtf import FlaskForm
 from wtforms import StringField, SelectField, IntegerField, TextAreaField, validators
+import click
 import mysql.connector
+from mysql.connector import errorcode
 import json
 import datetime
+import functools
+import gzip
 import requests
 import base64
+import bisect
+import copy
+import csv
+import hashlib
+import io
+import math
 from dotenv import load_dotenv
+from markupsafe import escape
+from jinja2 import TemplateNotFound
+import numpy as np
+try:
+    import brotli
+except ImportError:  # brotli is optional; pages are still served gzip-compressed
+    brotli = None
 import os
+import random
+import re
+import secrets
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict, deque
 
 # Load environment variables
 load_dotenv()
@@ -27,25 +61,82 @@ LANGUAGE_IDS = {
     "csharp": 51,  # C# Mono
 }
 
-def submit_to_judge0(source_code, language_id, stdin=""):
-    payload = {
-        "source_code": source_code,  # Remove base64.b64encode()!
-        "language_id": language_id,
-        "stdin": stdin,  # Remove base64 encoding here too
-        "cpu_time_limit": 5,
-        "memory_limit": 256000
-    }
-    
-    headers = {
+# Execution tuning: wait=true lets Judge0 hold the POST until the run finishes;
+# otherwise we poll with exponential backoff until a terminal status.
+JUDGE0_WAIT = os.getenv('JUDGE0_WAIT', 'false').lower() == 'true'
+JUDGE0_POLL_INITIAL = float(os.getenv('JUDGE0_POLL_INITIAL', 0.2))
+JUDGE0_POLL_MAX = float(os.getenv('JUDGE0_POLL_MAX', 2.0))
+JUDGE0_POLL_TIMEOUT = float(os.getenv('JUDGE0_POLL_TIMEOUT', 30))
+
+# Statuses 1 (In Queue) and 2 (Processing) mean the run has not finished yet
+JUDGE0_PENDING_STATUSES = (1, 2)
+
+# Reuse HTTP connections to Judge0 across submissions
+judge0_http = requests.Session()
+
+def judge0_headers():
+    return {
         "X-RapidAPI-Key": JUDGE0_API_KEY,
         "X-RapidAPI-Host": os.getenv('JUDGE0_API_HOST'),
         "Content-Type": "application/json"
     }
 
-    
-    # Submit the code
+def poll_judge0(token, headers):
+    """Fetch a submission until it leaves the queue, backing off between polls"""
+    delay = JUDGE0_POLL_INITIAL
+    deadline = time.monotonic() + JUDGE0_POLL_TIMEOUT
+    while True:
+        result_response = judge0_http.get(
+            f"{JUDGE0_API_URL}/submissions/{token}",
+            headers=headers,
+            params={"base64_encoded": "true", "fields": "*"}
+        )
+        result_response.raise_for_status()
+        result = result_response.json()
+
+        status_id = result.get("status", {}).get("id")
+        if status_id not in JUDGE0_PENDING_STATUSES or time.monotonic() + delay > deadline:
+            return result
+
+        time.sleep(delay)
+        delay = min(delay * 2, JUDGE0_POLL_MAX)
+
+def submit_to_judge0(source_code, language_id, stdin=""):
+    headers = judge0_headers()
+
     try:
-        response = requests.post(
+        if JUDGE0_WAIT:
+            # Judge0 only returns base64 output on wait=true if the input is base64 too
+            payload = {
+                "source_code": base64.b64encode(source_code.encode()).decode(),
+                "language_id": language_id,
+                "stdin": base64.b64encode((stdin or "").encode()).decode(),
+                "cpu_time_limit": 5,
+                "memory_limit": 256000
+            }
+            response = judge0_http.post(
+                f"{JUDGE0_API_URL}/submissions",
+                json=payload,
+                headers=headers,
+                params={"base64_encoded": "true", "wait": "true", "fields": "*"}
+            )
+            response.raise_for_status()
+            result = response.json()
+            token = result.get("token")
+            if result.get("status", {}).get("id") in JUDGE0_PENDING_STATUSES and token:
+                result = poll_judge0(token, headers)
+            return process_judge0_result(result)
+
+        payload = {
+            "source_code": source_code,  # Remove base64.b64encode()!
+            "language_id": language_id,
+            "stdin": stdin,  # Remove base64 encoding here too
+            "cpu_time_limit": 5,
+            "memory_limit": 256000
+        }
+
+        # Submit the code
+        response = judge0_http.post(
             f"{JUDGE0_API_URL}/submissions", 
             json=payload, 
             headers=headers
@@ -57,25 +148,102 @@ def submit_to_judge0(source_code, language_id, stdin=""):
         if not token:
             return {"error": "Failed to submit code for execution"}
         
-        # Get the submission result (with a small delay to allow processing)
-        import time
-        time.sleep(1)  # Wait for 1 second
-        
-        result_response = requests.get(
-            f"{JUDGE0_API_URL}/submissions/{token}",
-            headers=headers,
-            params={"base64_encoded": "true", "fields": "*"}
-        )
-        result_response.raise_for_status()
-        result = result_response.json()
-        
         # Process and return the result
-        processed_result = process_judge0_result(result)
-        return processed_result
+        return process_judge0_result(poll_judge0(token, headers))
         
     except requests.exceptions.RequestException as e:
         return {"error": f"Judge0 API Error: {str(e)}"}
 
+# Judge0 accepts at most this many submissions per batch request
+JUDGE0_BATCH_SIZE = int(os.getenv('JUDGE0_BATCH_SIZE', 20))
+
+def test_case_verdict(processed, expected_output):
+    """Turn a processed Judge0 result into a per-case verdict"""
+    if processed.get("error"):
+        return "Error", False
+    if processed.get("status_id") != 3:
+        return processed.get("status", "Error"), False
+    if processed.get("stdout", "").strip() != (expected_output or "").strip():
+        return "Wrong Answer", False
+    return "Accepted", True
+
+def judge_test_cases(source_code, language_id, test_cases, fail_fast=False):
+    """Run every test case through Judge0's batch API in one round trip.
+
+    test_cases is a list of dicts with "stdin" and "expected_output". Returns
+    one dict per case with the processed Judge0 result plus "verdict" and
+    "passed". With fail_fast, polling stops as soon as any finished case
+    fails and the unfinished ones are reported as "Skipped".
+    """
+    headers = judge0_headers()
+    results = [None] * len(test_cases)
+
+    try:
+        # Submit all cases, JUDGE0_BATCH_SIZE at a time
+        tokens = []
+        for start in range(0, len(test_cases), JUDGE0_BATCH_SIZE):
+            chunk = test_cases[start:start + JUDGE0_BATCH_SIZE]
+            response = judge0_http.post(
+                f"{JUDGE0_API_URL}/submissions/batch",
+                json={"submissions": [{
+                    "source_code": source_code,
+                    "language_id": language_id,
+                    "stdin": case["stdin"],
+                    "cpu_time_limit": 5,
+                    "memory_limit": 256000
+                } for case in chunk]},
+                headers=headers
+            )
+            response.raise_for_status()
+            tokens.extend(item.get("token") for item in response.json())
+
+        for index, token in enumerate(tokens):
+            if not token:
+                results[index] = {"error": "Failed to submit code for execution",
+                                  "verdict": "Error", "passed": False}
+
+        # Poll the outstanding tokens together until every case is terminal
+        delay = JUDGE0_POLL_INITIAL
+        deadline = time.monotonic() + JUDGE0_POLL_TIMEOUT
+        while True:
+            pending = [i for i, result in enumerate(results) if result is None]
+            for start in range(0, len(pending), JUDGE0_BATCH_SIZE):
+                chunk = pending[start:start + JUDGE0_BATCH_SIZE]
+                response = judge0_http.get(
+                    f"{JUDGE0_API_URL}/submissions/batch",
+                    headers=headers,
+                    params={"tokens": ",".join(tokens[i] for i in chunk),
+                            "base64_encoded": "true", "fields": "*"}
+                )
+                response.raise_for_status()
+                for index, raw in zip(chunk, response.json().get("submissions", [])):
+                    if raw.get("status", {}).get("id") in JUDGE0_PENDING_STATUSES:
+                        continue
+                    processed = process_judge0_result(raw)
+                    verdict, passed = test_case_verdict(processed, test_cases[index]["expected_output"])
+                    processed.update({"verdict": verdict, "passed": passed})
+                    results[index] = processed
+
+            pending = [i for i, result in enumerate(results) if result is None]
+            failed = any(result and not result["passed"] for result in results)
+            if not pending or (fail_fast and failed) or time.monotonic() + delay > deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, JUDGE0_POLL_MAX)
+
+    except requests.exceptions.RequestException as e:
+        error = f"Judge0 API Error: {str(e)}"
+        return [result or {"error": error, "verdict": "Error", "passed": False}
+                for result in results]
+
+    for index, result in enumerate(results):
+        if result is None:
+            # Still queued when we stopped waiting
+            verdict = "Skipped" if fail_fast else "Processing"
+            results[index] = {"status": verdict, "verdict": verdict,
+                              "passed": False, "stdout": "", "time": "0", "memory": "0"}
+    return results
+
 def process_judge0_result(result):
     """Process the Judge0 API result"""
     # Status codes: https://github.com/judge0/judge0/blob/master/docs/api/submissions.md#submission-status
@@ -133,15 +301,270 @@ def process_judge0_result(result):
         "success": status_id == 3  # Status 3 is "Accepted"
     }
 
+# ----- Code executors -----
+# submit_code can run code on the remote Judge0 API or on this machine
+# (CODE_EXECUTOR=judge0|local). Both return process_judge0_result dicts.
+
+class Judge0Executor:
+    name = "judge0"
+
+    def run(self, source_code, language_id, stdin=""):
+        return submit_to_judge0(source_code, language_id, stdin)
+
+    def run_batch(self, source_code, language_id, test_cases, fail_fast=False):
+        return judge_test_cases(source_code, language_id, test_cases, fail_fast=fail_fast)
+
+
+# Started by LocalExecutor for every compile and run, as
+# `python -I -S -c LOCAL_RUN_LAUNCHER <report fd> <cpu s> <fsize bytes> <as bytes> cmd...`.
+# It forks the program, applies the rlimits in the (single-threaded) child
+# before exec, and writes [wait status, CPU seconds, max RSS KB] to the
+# report fd. Forking from this small process keeps the web worker's memory
+# out of the program's ru_maxrss, which exec carries over from the process
+# that forked it, so figures bottom out at the launcher's few MB rather
+# than the worker's size. It also avoids preexec_fn in the threaded server.
+LOCAL_RUN_LAUNCHER = """
+import json, os, resource, signal, sys
+report, cpu, fsize, memory = (int(arg) for arg in sys.argv[1:5])
+pid = os.fork()
+if pid == 0:
+    try:
+        os.close(report)
+        for signum in (signal.SIGPIPE, signal.SIGXFSZ):
+            signal.signal(signum, signal.SIG_DFL)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+        if memory:
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        os.execvp(sys.argv[5], sys.argv[5:])
+    except BaseException as e:
+        os.write(2, f"{e}\\n".encode())
+    os._exit(127)
+_, status, usage = os.wait4(pid, 0)
+os.write(report, json.dumps([status, usage.ru_utime + usage.ru_stime, usage.ru_maxrss]).encode())
+"""
+
+class LocalExecutor:
+    """Runs submissions as local subprocesses under rlimits.
+
+    Each run gets a scratch directory, a CPU-time limit, an address-space
+    limit and a cap on captured output; compiled languages are built once per
+    submission and every test case then runs on a shared worker pool. This
+    is resource limiting, not isolation: only enable it on a host dedicated
+    to running student code.
+    """
+
+    name = "local"
+
+    # language_id -> (source file name, compile command or None, run command)
+    LANGUAGES = {
+        71: ("main.py", None, ["python3", "main.py"]),
+        50: ("main.c", ["gcc", "-O2", "-o", "main", "main.c", "-lm"], ["./main"]),
+        54: ("main.cpp", ["g++", "-O2", "-std=c++17", "-o", "main", "main.cpp"], ["./main"]),
+    }
+
+    def __init__(self, workers=None, cpu_time_limit=5, memory_limit_kb=256000,
+                 max_output_bytes=64 * 1024, compile_timeout=30):
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_kb = memory_limit_kb
+        self.max_output_bytes = max_output_bytes
+        self.compile_timeout = compile_timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 2,
+                                       thread_name_prefix='local-exec')
+
+    def run(self, source_code, language_id, stdin=""):
+        return self._run_cases(source_code, language_id, [{"stdin": stdin, "expected_output": None}])[0]
+
+    def run_batch(self, source_code, language_id, test_cases, fail_fast=False):
+        """Same contract as judge_test_cases: every result gets "verdict" and "passed"."""
+        results = self._run_cases(source_code, language_id, test_cases, fail_fast)
+        for case, result in zip(test_cases, results):
+            if "verdict" not in result:
+                verdict, passed = test_case_verdict(result, case["expected_output"])
+                result.update({"verdict": verdict, "passed": passed})
+        return results
+
+    def _run_cases(self, source_code, language_id, test_cases, fail_fast=False):
+        if language_id not in self.LANGUAGES:
+            # Hand languages we cannot run locally to Judge0 when it is configured
+            if JUDGE0_API_URL:
+                return Judge0Executor().run_batch(source_code, language_id, test_cases, fail_fast=fail_fast)
+            return [{"error": "Language is not supported by the local executor"} for _ in test_cases]
+
+        file_name, compile_cmd, run_cmd = self.LANGUAGES[language_id]
+        with tempfile.TemporaryDirectory(prefix='ccc-run-') as workdir:
+            with open(os.path.join(workdir, file_name), 'w') as f:
+                f.write(source_code)
+
+            if compile_cmd:
+                compiled = self._execute(compile_cmd, workdir, "", cpu_time_limit=self.compile_timeout,
+                                         memory_limit_kb=None)
+                if compiled["returncode"] != 0:
+                    result = process_judge0_result({
+                        "status": {"id": 6},
+                        "compile_output": base64.b64encode(compiled["stderr"] or compiled["stdout"]).decode(),
+                    })
+                    return [dict(result) for _ in test_cases]
+
+            futures = [self.pool.submit(self._run_case, run_cmd, workdir, case["stdin"] or "")
+                       for case in test_cases]
+            results = []
+            failed = False
+            for case, future in zip(test_cases, futures):
+                if failed:
+                    future.cancel()
+                    results.append({"status": "Skipped", "status_id": None, "stdout": "", "stderr": "",
+                                    "compile_output": "", "time": "0", "memory": "0", "success": False})
+                    continue
+                result = future.result()
+                results.append(result)
+                if fail_fast and case.get("expected_output") is not None:
+                    failed = not test_case_verdict(result, case["expected_output"])[1]
+            # Cancelled cases never started; wait for any still running
+            # before the scratch directory is removed
+            for future in futures:
+                if not future.cancelled():
+                    future.exception()
+            return results
+
+    def _run_case(self, run_cmd, workdir, stdin):
+        run = self._execute(run_cmd, workdir, stdin, cpu_time_limit=self.cpu_time_limit,
+                            memory_limit_kb=self.memory_limit_kb)
+
+        if run["timed_out"] or run["signal"] == signal.SIGXCPU or run["signal"] == signal.SIGKILL and \
+                run["cpu_time"] >= self.cpu_time_limit:
+            status_id = 5
+        elif run["output_exceeded"] or run["signal"] == signal.SIGXFSZ:
+            status_id = 8
+        elif run["signal"] == signal.SIGSEGV:
+            status_id = 7
+        elif run["signal"] == signal.SIGFPE:
+            status_id = 9
+        elif run["signal"] == signal.SIGABRT:
+            status_id = 10
+        elif run["returncode"] != 0:
+            status_id = 11
+        else:
+            status_id = 3
+
+        return process_judge0_result({
+            "status": {"id": status_id},
+            "stdout": base64.b64encode(run["stdout"]).decode(),
+            "stderr": base64.b64encode(run["stderr"]).decode(),
+            "time": f"{run['cpu_time']:.3f}",
+            "memory": run["memory"],
+        })
+
+    def _execute(self, cmd, workdir, stdin, cpu_time_limit, memory_limit_kb):
+        report_read, report_write = os.pipe()
+        try:
+            proc = subprocess.Popen(
+                [sys.executable, "-I", "-S", "-c", LOCAL_RUN_LAUNCHER, str(report_write),
+                 str(cpu_time_limit), str(self.max_output_bytes), str((memory_limit_kb or 0) * 1024),
+                 *cmd],
+                cwd=workdir, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                env={"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "LANG": "C.UTF-8"},
+                pass_fds=(report_write,), start_new_session=True
+            )
+        except BaseException:
+            os.close(report_read)
+            raise
+        finally:
+            os.close(report_write)
+
+        # Pump stdin/stdout/stderr ourselves so output can be capped
+        outputs = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+        pending_input = memoryview(stdin.encode())
+        output_exceeded = timed_out = False
+        deadline = time.monotonic() + cpu_time_limit * 2 + 1
+
+        with selectors.DefaultSelector() as selector:
+            for stream in outputs:
+                selector.register(stream, selectors.EVENT_READ)
+            if pending_input:
+                selector.register(proc.stdin, selectors.EVENT_WRITE)
+            else:
+                proc.stdin.close()
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is proc.stdin:
+                        try:
+                            written = os.write(proc.stdin.fileno(), pending_input[:65536])
+                        except BrokenPipeError:
+                            written = len(pending_input)
+                        pending_input = pending_input[written:]
+                        if not pending_input:
+                            selector.unregister(proc.stdin)
+                            proc.stdin.close()
+                        continue
+                    chunk = os.read(key.fileobj.fileno(), 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    buffer = outputs[key.fileobj]
+                    buffer.extend(chunk)
+                    if len(buffer) > self.max_output_bytes:
+                        del buffer[self.max_output_bytes:]
+                        output_exceeded = True
+                if output_exceeded:
+                    break
+
+        if timed_out or output_exceeded:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        proc.wait()
+        for stream in (proc.stdin, proc.stdout, proc.stderr):
+            if not stream.closed:
+                stream.close()
+        with os.fdopen(report_read, 'rb') as report:
+            raw = report.read()
+
+        # The launcher reports the program's exit status and rusage; without
+        # a report (the launcher itself was killed) only its status is known
+        returncode, cpu_time, memory = proc.returncode, 0.0, None
+        if raw:
+            wait_status, cpu_time, memory = json.loads(raw)
+            returncode = os.waitstatus_to_exitcode(wait_status)
+
+        return {
+            "returncode": returncode,
+            "signal": -returncode if returncode < 0 else None,
+            "stdout": bytes(outputs[proc.stdout]),
+            "stderr": bytes(outputs[proc.stderr]),
+            "cpu_time": cpu_time,
+            "memory": memory,  # KB on Linux
+            "timed_out": timed_out,
+            "output_exceeded": output_exceeded,
+        }
+
+
+def make_code_executor(name):
+    if name == "local":
+        return LocalExecutor(workers=int(os.getenv('LOCAL_EXECUTOR_WORKERS') or 0) or None)
+    return Judge0Executor()
+
+code_runner = make_code_executor(os.getenv('CODE_EXECUTOR', 'judge0').lower())
+
 app = Flask(__name__)
 
+# bcrypt work factor for new and upgraded password hashes
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
 bcrypt = Bcrypt(app)
 
 # Secret key for session management
 app.secret_key = os.getenv('FLASK_SECRET_KEY')  # Change this to a secure key
 
-# Function to get a database connection
-def get_db_connection():
+# Function to open a brand-new database connection (used by the pool)
+def open_db_connection():
     return mysql.connector.connect(
         host=os.getenv('DB_HOST'),
         user=os.getenv('DB_USER'),
@@ -149,50 +572,917 @@ def get_db_connection():
         database=os.getenv('DB_NAME')
     )
 
-@app.route('/')
-def index():
-    return render_template('index.html')
 
-@app.route('/studenthome')
-def home2():
-    return render_template('home2.html')
+class PooledConnection:
+    """Wraps a raw MySQL connection checked out from a ConnectionPool.
+
+    close() hands the connection back to the pool instead of disconnecting.
+    Connections bound to a request are released at app-context teardown, so
+    close() is a no-op for them and later get_db_connection() calls in the
+    same request reuse the connection.
+    """
+
+    def __init__(self, pool, raw, request_scoped=False):
+        self._pool = pool
+        self._raw = raw
+        self._request_scoped = request_scoped
+
+    def close(self):
+        if self._request_scoped or self._raw is None:
+            return
+        self.release()
+
+    def release(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw)
+
+    def is_connected(self):
+        return self._raw is not None and self._raw.is_connected()
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise mysql.connector.errors.OperationalError("Connection has been returned to the pool")
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool.
+
+    Keeps up to `size` idle connections, allows `max_overflow` extra
+    connections under load and makes callers wait up to `timeout` seconds
+    when everything is checked out. Idle connections are pinged on checkout
+    and replaced if the server dropped them.
+    """
+
+    def __init__(self, connect, size=5, max_overflow=10, timeout=30.0):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "misses": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+        }
 
-@app.route('/home')
-def home():
-    return render_template('home.html')
+    def checkout(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        raw = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+            self._stats["checkouts"] += 1
+            self._stats["wait_time"] += time.monotonic() - start
+
+        if raw is not None and not self._is_healthy(raw):
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            self._disconnect(raw)
+            raw = None
+
+        if raw is None:
+            with self._cond:
+                self._stats["misses"] += 1
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+        return raw
+
+    def release(self, raw):
+        # Never hand out a connection with a half-finished transaction
+        keep = True
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            keep = False
+
+        with self._cond:
+            if keep and len(self._idle) < self.size:
+                self._idle.append(raw)
+                raw = None
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if raw is not None:
+            self._disconnect(raw)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+            })
+        checkouts = stats["checkouts"]
+        stats["avg_wait_ms"] = round(stats["wait_time"] * 1000 / checkouts, 3) if checkouts else 0.0
+        return stats
+
+    def _is_healthy(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
 
-@app.route('/student-login', methods=['GET', 'POST'])
-def student_login():
-    
-    if request.method == 'POST':
-        email = request.form['studentEmail']
-        password = request.form['studentPassword']
+    def _disconnect(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
 
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)  # Use dictionary cursor for better readability
 
-        cursor.execute("SELECT * FROM Users WHERE Email = %s", (email,))
+db_pool = ConnectionPool(
+    open_db_connection,
+    size=int(os.getenv('DB_POOL_SIZE', 5)),
+    max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+    timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+)
+
+# Function to get a database connection
+def get_db_connection():
+    # Inside a request every caller shares one pooled connection
+    if has_app_context():
+        conn = g.get('db_conn')
+        if conn is None or conn._raw is None:
+            conn = PooledConnection(db_pool, db_pool.checkout(), request_scoped=True)
+            g.db_conn = conn
+        return conn
+    return PooledConnection(db_pool, db_pool.checkout())
+
+@app.teardown_appcontext
+def release_db_connection(exc):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn.release()
+
+# ----- Password hashing -----
+# bcrypt is deliberately slow, so hashing and verification run on a small
+# process pool instead of the request thread. Hashes stored with a different
+# cost are upgraded to BCRYPT_LOG_ROUNDS the next time the user logs in.
+BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS') or 0) or os.cpu_count() or 1
+BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING') or 0) or BCRYPT_WORKERS * 4
+BCRYPT_QUEUE_TIMEOUT = float(os.getenv('BCRYPT_QUEUE_TIMEOUT', 5))
+
+password_pool = ProcessPoolExecutor(max_workers=BCRYPT_WORKERS)
+password_slots = threading.BoundedSemaphore(BCRYPT_MAX_PENDING)
+
+class PasswordPoolBusy(Exception):
+    """Raised when the hashing queue stays full for BCRYPT_QUEUE_TIMEOUT seconds"""
+
+def run_password_job(fn, *args):
+    # Bound the queue so a login storm is refused quickly rather than piling up
+    if not password_slots.acquire(timeout=BCRYPT_QUEUE_TIMEOUT):
+        raise PasswordPoolBusy()
+    try:
+        return password_pool.submit(fn, *args).result()
+    finally:
+        password_slots.release()
+
+def hash_password(password):
+    salt = bcrypt_lib.gensalt(rounds=app.config['BCRYPT_LOG_ROUNDS'])
+    return run_password_job(bcrypt_lib.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+def check_password(stored_hash, password):
+    try:
+        return run_password_job(bcrypt_lib.checkpw, password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except ValueError:  # malformed hash, or a password over bcrypt's 72-byte limit
+        return False
+
+def password_needs_rehash(stored_hash):
+    # Stored hashes look like $2b$<cost>$<salt+digest>
+    parts = stored_hash.split('$')
+    return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != app.config['BCRYPT_LOG_ROUNDS']
+
+def authenticate(email, password):
+    """Return the Users row for a valid login, upgrading its hash cost if needed"""
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT UserID, Name, Email, Password, Role FROM Users WHERE Email = %s", (email,))
         user = cursor.fetchone()
+        if not user or not check_password(user['Password'], password):
+            return None
+
+        if password_needs_rehash(user['Password']):
+            try:
+                cursor.execute(
+                    "UPDATE Users SET Password = %s WHERE UserID = %s AND Password = %s",
+                    (hash_password(password), user['UserID'], user['Password'])
+                )
+                conn.commit()
+            except (PasswordPoolBusy, mysql.connector.Error) as e:
+                # The old hash still works; try again on the next login
+                conn.rollback()
+                print(f"Password rehash skipped for user {user['UserID']}: {e}")
+        return user
+    finally:
         cursor.close()
         conn.close()
 
-        if user and bcrypt.check_password_hash(user['Password'], password):  # Assuming 'Password' is the correct column name
-            if user['Role'] == 'Student':  # Ensure role is 'Student'
-                session['loggedin'] = True
-                session['id'] = user['UserID']
-                session['email'] = user['Email']
-                session['role'] = user['Role']
-               
-
-                flash("Login successful!", "success")
-                return redirect(url_for('home2'))  # Redirect to home after login
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, max_entries=1000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None, predicate=None):
+        """Drop one key, every key matching predicate, or everything"""
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+            elif predicate is not None:
+                for k in [k for k in self._entries if predicate(k)]:
+                    del self._entries[k]
             else:
-                flash("You are not registered as a student.", "danger")
+                self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# ----- Server-side sessions -----
+# With SESSION_BACKEND=memory or sql the session cookie holds only a random
+# id; the data lives in a SessionStore and is fetched the first time a view
+# touches `session`, so static files and other session-free requests never
+# load it. SESSION_BACKEND=cookie keeps Flask's signed-cookie sessions.
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'cookie').lower()
+SESSION_TTL = int(os.getenv('SESSION_TTL', 86400))
+SESSION_PURGE_CHANCE = float(os.getenv('SESSION_PURGE_CHANCE', 0.01))
+
+class ServerSideSession(SessionMixin):
+    """Session dict backed by a store; loaded lazily on first access"""
+
+    def __init__(self, interface, sid=None):
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+        self.stale_sid = None
+        self.expires_at = None
+        self._interface = interface
+        self._data = {} if sid is None else None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            self._data, self.expires_at = self._interface.load(self.sid)
+            if self._data is None:
+                # Unknown or expired id: never adopt an id the client picked
+                self._data, self.sid, self.new = {}, None, True
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def clear(self):
+        self._load()
+        self._data = {}
+        self.modified = True
+
+    def regenerate(self):
+        """Move the data to a fresh id, e.g. at login, and drop the old record"""
+        self._load()
+        if self.sid is not None:
+            self.stale_sid, self.sid = self.sid, None
+        self.modified = True
+
+
+class MemorySessionStore:
+    """Per-process LRU of serialized sessions; for single-process deployments"""
+
+    name = "memory"
+
+    def __init__(self, max_entries, ttl):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, sid):
+        return self._cache.get(sid)
+
+    def set(self, sid, payload, expires_at):
+        self._cache.put(sid, (payload, expires_at))
+
+    def delete(self, sid):
+        self._cache.invalidate(sid)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class SQLSessionStore:
+    """Sessions in the `sessions` table, shared by every worker and node"""
+
+    name = "sql"
+
+    def _run(self, query, params, fetch=False):
+        # Own connection, so saving the session never commits a view's work
+        conn = PooledConnection(db_pool, db_pool.checkout())
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            if fetch:
+                return cursor.fetchone()
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
 
-        else:
+    def get(self, sid):
+        row = self._run(
+            "SELECT data, UNIX_TIMESTAMP(expires_at) FROM sessions WHERE id = %s AND expires_at > NOW()",
+            (sid,), fetch=True
+        )
+        return (row[0], float(row[1])) if row else None
+
+    def set(self, sid, payload, expires_at):
+        self._run("""
+            INSERT INTO sessions (id, data, expires_at) VALUES (%s, %s, FROM_UNIXTIME(%s))
+            ON DUPLICATE KEY UPDATE data = VALUES(data), expires_at = VALUES(expires_at)
+        """, (sid, payload, expires_at))
+        if random.random() < SESSION_PURGE_CHANCE:
+            self._run("DELETE FROM sessions WHERE expires_at < NOW() LIMIT 1000", ())
+
+    def delete(self, sid):
+        self._run("DELETE FROM sessions WHERE id = %s", (sid,))
+
+    def stats(self):
+        return {}
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps only an opaque id in the cookie"""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, ttl=SESSION_TTL):
+        self.store = store
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"loads": 0, "hits": 0, "misses": 0, "load_time": 0.0, "max_load_ms": 0.0,
+                       "saves": 0, "save_time": 0.0, "deletes": 0}
+
+    def open_session(self, app, request):
+        return ServerSideSession(self, request.cookies.get(self.get_cookie_name(app)) or None)
+
+    def load(self, sid):
+        started = time.perf_counter()
+        record = self.store.get(sid)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["loads"] += 1
+            self._stats["hits" if record else "misses"] += 1
+            self._stats["load_time"] += elapsed
+            self._stats["max_load_ms"] = max(self._stats["max_load_ms"], elapsed * 1000)
+        if record is None:
+            return None, None
+        payload, expires_at = record
+        return self.serializer.loads(payload), expires_at
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.stale_sid is not None:
+            self._delete(session.stale_sid)
+        if not session.accessed:
+            return  # the view never used the session, so nothing changed
+        response.vary.add('Cookie')
+
+        if not session:
+            if session.sid is not None:
+                self._delete(session.sid)
+            if session.modified or session.sid is not None:
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        # Untouched sessions are only rewritten once half their lifetime is used
+        expiring = session.expires_at is not None and session.expires_at - time.time() < self.ttl / 2
+        if not (session.modified or session.new or expiring):
+            return
+
+        started = time.perf_counter()
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        self.store.set(session.sid, self.serializer.dumps(dict(session)), time.time() + self.ttl)
+        with self._lock:
+            self._stats["saves"] += 1
+            self._stats["save_time"] += time.perf_counter() - started
+
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain, path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def _delete(self, sid):
+        self.store.delete(sid)
+        with self._lock:
+            self._stats["deletes"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_load_ms"] = round(stats.pop("load_time") * 1000 / stats["loads"], 3) if stats["loads"] else 0.0
+        stats["avg_save_ms"] = round(stats.pop("save_time") * 1000 / stats["saves"], 3) if stats["saves"] else 0.0
+        stats["max_load_ms"] = round(stats["max_load_ms"], 3)
+        stats["hit_rate"] = round(stats["hits"] / stats["loads"], 4) if stats["loads"] else 0.0
+        return {"backend": self.store.name, "ttl": self.ttl, **stats, "store": self.store.stats()}
+
+
+def make_session_interface(backend):
+    if backend == 'memory':
+        return ServerSideSessionInterface(
+            MemorySessionStore(max_entries=int(os.getenv('SESSION_MEMORY_MAX_ENTRIES', 10000)), ttl=SESSION_TTL))
+    if backend == 'sql':
+        return ServerSideSessionInterface(SQLSessionStore())
+    return None
+
+session_interface = make_session_interface(SESSION_BACKEND)
+if session_interface is not None:
+    app.session_interface = session_interface
+
+# ----- Authentication and role guards -----
+# Every login page goes through handle_login(), and views declare who may use
+# them with @require_role. Names and Student/Alumni details are read through a
+# per-process profile cache so views can skip joining Users.
+LOGIN_ROLES = {
+    'Student': {"form": "student", "template": 'SL.html', "home": 'home2',
+                "welcome": "Login successful!", "wrong_role": "You are not registered as a student."},
+    'Alumni': {"form": "alumni", "template": 'AL.html', "home": 'home3',
+               "welcome": "Login successful!", "wrong_role": "You are not registered as an Alumni.",
+               "email_domain": '@rajagiri.edu.in'},
+    'Admin': {"form": "admin", "template": 'ADL.html', "home": 'admin_dashboard',
+              "welcome": "Admin login successful!", "wrong_role": "You are not registered as an Admin."},
+}
+
+# Carries every key the pages' fetch handlers look at (error, message, success, status)
+UNAUTHORIZED_BODY = {"success": False, "status": "error", "error": "Unauthorized", "message": "Unauthorized"}
+
+def start_user_session(user):
+    if isinstance(session, ServerSideSession):
+        session.regenerate()  # a fresh id at login, so a planted one is useless
+    session['loggedin'] = True
+    session['id'] = user['UserID']
+    session['email'] = user['Email']
+    session['role'] = user['Role']
+    session['name'] = user['Name']
+
+def handle_login(role):
+    """GET renders the role's login page; POST checks the credentials and role"""
+    config = LOGIN_ROLES[role]
+    if request.method == 'POST':
+        email = request.form[f"{config['form']}Email"]
+        password = request.form[f"{config['form']}Password"]
+
+        domain = config.get("email_domain")
+        if domain and not email.endswith(domain):
+            flash(f"{role} must use an email ending with {domain}", "danger")
+            return redirect(request.path)
+
+        try:
+            user = authenticate(email, password)
+        except PasswordPoolBusy:
+            flash("Too many people are logging in right now. Please try again in a moment.", "danger")
+            return render_template(config["template"]), 503
+
+        if user is None:
             flash("Invalid email or password", "danger")
+        elif user['Role'] != role:
+            flash(config["wrong_role"], "danger")
+        else:
+            start_user_session(user)
+            flash(config["welcome"], "success")
+            return redirect(url_for(config["home"]))
+
+    return render_template(config["template"])
+
+def require_role(*roles, redirect_to=None, message="Unauthorized access!"):
+    """Only let logged-in users with one of `roles` (any role if none given) reach the view.
+
+    Page views pass `redirect_to`, an endpoint to send everyone else to with
+    `message` flashed. API views answer 401 when nobody is logged in and 403
+    for the wrong role.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            logged_in = 'loggedin' in session
+            if logged_in and (not roles or session.get('role') in roles):
+                return view(*args, **kwargs)
+            if redirect_to is not None:
+                flash(message, "danger")
+                return redirect(url_for(redirect_to))
+            return jsonify(UNAUTHORIZED_BODY), 403 if logged_in else 401
+        return wrapper
+    return decorator
+
+user_profiles = TTLCache(
+    max_entries=int(os.getenv('USER_PROFILE_CACHE_SIZE', 5000)),
+    ttl=int(os.getenv('USER_PROFILE_TTL', 300))
+)
+
+def load_user_profiles(cursor, user_ids):
+    """Map UserID -> profile dict (name, email, role, student, alumni).
+
+    Cached profiles are reused; the rest are fetched together. `cursor` must
+    be a dictionary cursor. Unknown ids are left out of the result.
+    """
+    profiles = {}
+    missing = []
+    for user_id in dict.fromkeys(user_id for user_id in user_ids if user_id is not None):
+        profile = user_profiles.get(user_id)
+        if profile is None:
+            missing.append(user_id)
+        else:
+            profiles[user_id] = profile
+    if not missing:
+        return profiles
+
+    placeholders = ", ".join(["%s"] * len(missing))
+    cursor.execute(f"SELECT UserID, Name, Email, Role FROM Users WHERE UserID IN ({placeholders})", missing)
+    loaded = {
+        row['UserID']: {"id": row['UserID'], "name": row['Name'], "email": row['Email'],
+                        "role": row['Role'], "student": None, "alumni": None}
+        for row in cursor.fetchall()
+    }
+    for role, key, columns in (('Student', 'student', "student_id, batch_year"),
+                               ('Alumni', 'alumni', "alumni_id, grad_year, company, designation, bio")):
+        ids = [user_id for user_id, profile in loaded.items() if profile['role'] == role]
+        if ids:
+            cursor.execute(
+                f"SELECT UserID, {columns} FROM {role} WHERE UserID IN ({', '.join(['%s'] * len(ids))})", ids)
+            for row in cursor.fetchall():
+                loaded[row.pop('UserID')][key] = row
+
+    for user_id, profile in loaded.items():
+        user_profiles.put(user_id, profile)
+    profiles.update(loaded)
+    return profiles
+
+def attach_user_names(cursor, rows, columns):
+    """Replace user-id columns with names, e.g. {'user_id': 'student_name'}"""
+    profiles = load_user_profiles(cursor, [row[id_column] for row in rows for id_column in columns])
+    for row in rows:
+        for id_column, name_column in columns.items():
+            profile = profiles.get(row.pop(id_column))
+            row[name_column] = profile['name'] if profile else None
+    return rows
+
+# ----- HTTP response caching -----
+# Read-heavy JSON endpoints keep their serialized payload in memory, keyed on
+# a per-scope version counter that the write routes bump, and answer
+# conditional requests with 304s. Other worker processes see a bump only
+# once their copy expires (RESPONSE_CACHE_TTL). Browsers may reuse a
+# response without asking for RESPONSE_MAX_AGE seconds where the route allows.
+
+response_cache = TTLCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', 500)),
+    ttl=int(os.getenv('RESPONSE_CACHE_TTL', 60))
+)
+RESPONSE_MAX_AGE = int(os.getenv('RESPONSE_MAX_AGE', 60))
+content_versions = {}
+content_versions_lock = threading.Lock()
+started_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+def bump_content_version(scope):
+    with content_versions_lock:
+        version, modified = content_versions.get(scope, (0, started_at))
+        # Last-Modified has one-second resolution; step past the previous
+        # value so If-Modified-Since never matches the new version
+        now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        content_versions[scope] = (version + 1, max(now, modified + datetime.timedelta(seconds=1)))
+
+def cached_response(scope, allow=None, cache_control='private, no-cache'):
+    """Cache a view's 200 responses until `scope`'s version is bumped.
+
+    `allow` is checked before serving from cache; when it fails the view
+    runs normally so it can return its own 401/403 (which is never cached).
+    `cache_control` is sent with every response, so each route says how long
+    browsers may reuse it.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if allow is not None and not allow():
+                return view(*args, **kwargs)
+
+            with content_versions_lock:
+                version, modified = content_versions.get(scope, (0, started_at))
+            key = (request.endpoint, scope, version, request.full_path)
+
+            cached = response_cache.get(key)
+            if cached is None:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                cached = {
+                    "body": body,
+                    "mimetype": response.mimetype,
+                    "etag": hashlib.sha256(body).hexdigest()[:32],
+                }
+                response_cache.put(key, cached)
+
+            response = app.response_class(cached["body"], mimetype=cached["mimetype"])
+            response.set_etag(cached["etag"])
+            response.last_modified = modified
+            response.headers['Cache-Control'] = cache_control
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+# ----- Static asset pipeline -----
+# `flask build-assets` writes content-hashed, resized and WebP copies of
+# static/images into static/dist and records them in a manifest. Templates link
+# images through static_url(), which falls back to the source file until the
+# build has been run.
+ASSET_SOURCE_DIR = 'images'
+ASSET_DIST_DIR = 'dist'
+ASSET_WIDTHS = tuple(int(w) for w in os.getenv('ASSET_WIDTHS', '200,400,800,1600').split(','))
+ASSET_WEBP = os.getenv('ASSET_WEBP', 'true').lower() == 'true'
+ASSET_JPEG_QUALITY = int(os.getenv('ASSET_JPEG_QUALITY', 82))
+ASSET_MAX_AGE = 31536000
+STATIC_URL_CALL = re.compile(r"static_url\(\s*'([^']+)'(?:\s*,\s*width\s*=\s*(\d+))?\s*\)")
+
+asset_manifest = {"mtime": None, "assets": {}}
+
+def asset_manifest_path():
+    return os.path.join(app.static_folder, ASSET_DIST_DIR, 'manifest.json')
+
+def load_asset_manifest():
+    """Return the build manifest, re-reading it when the file changes"""
+    path = asset_manifest_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if mtime != asset_manifest["mtime"]:
+        with open(path) as f:
+            asset_manifest["assets"] = json.load(f)
+        asset_manifest["mtime"] = mtime
+    return asset_manifest["assets"]
+
+def pick_asset_variant(entry, width=None):
+    """Smallest built file at least `width` pixels wide, preferring WebP"""
+    variants = entry["variants"]
+    if ASSET_WEBP and any(v["format"] == "webp" for v in variants):
+        variants = [v for v in variants if v["format"] == "webp"]
+    else:
+        variants = [v for v in variants if v["format"] != "webp"]
+    wide_enough = [v for v in variants if width is None or v["width"] >= width]
+    if width is None or not wide_enough:
+        return max(variants, key=lambda v: (v["width"], -v["bytes"]))
+    return min(wide_enough, key=lambda v: (v["width"], v["bytes"]))
+
+@app.template_global()
+def static_url(path, width=None):
+    """URL of a static file, resolved through the asset manifest when built"""
+    entry = load_asset_manifest().get(path)
+    if entry is None:
+        return url_for('static', filename=path)
+    return url_for('static', filename=pick_asset_variant(entry, width)["path"])
+
+@app.after_request
+def cache_built_assets(response):
+    # Built files carry their content hash in the name, so they never change
+    if request.path.startswith(f"{app.static_url_path}/{ASSET_DIST_DIR}/") and response.status_code == 200:
+        response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
+def write_asset(image, stem, width, fmt, dist_dir):
+    """Encode one variant and store it under a content-hashed name"""
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=ASSET_JPEG_QUALITY, method=6)
+        ext = "webp"
+    elif fmt == "jpeg":
+        image.convert("RGB").save(buffer, "JPEG", quality=ASSET_JPEG_QUALITY,
+                                  optimize=True, progressive=True)
+        ext = "jpg"
+    else:
+        image.save(buffer, "PNG", optimize=True)
+        ext = "png"
+    data = buffer.getvalue()
+    name = f"{stem}-{width}.{hashlib.sha256(data).hexdigest()[:12]}.{ext}"
+    with open(os.path.join(dist_dir, name), 'wb') as f:
+        f.write(data)
+    return {"path": f"{ASSET_DIST_DIR}/{ASSET_SOURCE_DIR}/{name}", "width": width,
+            "format": fmt, "bytes": len(data)}
+
+def asset_savings_report(assets):
+    """Per template: bytes of the source images it links vs the built files it gets"""
+    report = []
+    for name in sorted(os.listdir(app.template_folder)):
+        with open(os.path.join(app.template_folder, name), encoding='utf-8') as f:
+            refs = set(STATIC_URL_CALL.findall(f.read()))
+        before = after = 0
+        for path, width in refs:
+            entry = assets.get(path)
+            if entry is None:
+                continue
+            before += entry["bytes"]
+            after += pick_asset_variant(entry, int(width) if width else None)["bytes"]
+        if before:
+            report.append((name, before, after))
+    return report
+
+@app.cli.command('build-assets')
+def build_assets():
+    """Fingerprint, resize and WebP-encode static/images into static/dist."""
+    from PIL import Image  # only the build step needs Pillow
+
+    source_dir = os.path.join(app.static_folder, ASSET_SOURCE_DIR)
+    dist_dir = os.path.join(app.static_folder, ASSET_DIST_DIR, ASSET_SOURCE_DIR)
+    shutil.rmtree(os.path.join(app.static_folder, ASSET_DIST_DIR), ignore_errors=True)
+    os.makedirs(dist_dir)
+
+    assets = {}
+    for filename in sorted(os.listdir(source_dir)):
+        stem, ext = os.path.splitext(filename)
+        fmt = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png"}.get(ext.lower())
+        if fmt is None:
+            continue
+        source = os.path.join(source_dir, filename)
+        with Image.open(source) as image:
+            image.load()
+        widths = [w for w in ASSET_WIDTHS if w < image.width] + [image.width]
+        variants = []
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            variants.append(write_asset(resized, stem, width, fmt, dist_dir))
+            if ASSET_WEBP:
+                variants.append(write_asset(resized, stem, width, "webp", dist_dir))
+        assets[f"{ASSET_SOURCE_DIR}/{filename}"] = {
+            "width": image.width, "bytes": os.path.getsize(source), "variants": variants,
+        }
+        click.echo(f"{filename}: {len(variants)} files")
+
+    with open(asset_manifest_path(), 'w') as f:
+        json.dump(assets, f, indent=2, sort_keys=True)
+
+    click.echo("\nBytes per page (source -> built):")
+    total_before = total_after = 0
+    for name, before, after in asset_savings_report(assets):
+        total_before += before
+        total_after += after
+        click.echo(f"  {name:<20} {before:>9,} -> {after:>9,}  saved {before - after:,}")
+    click.echo(f"  {'total':<20} {total_before:>9,} -> {total_after:>9,}  saved {total_before - total_after:,}")
+
+# ----- Static page rendering -----
+# Pages that render without per-user context are rendered once per process and
+# held in memory together with gzip/brotli variants.
+
+STATIC_PAGES = (
+    'index.html', 'home.html', 'home2.html', 'about.html', 'CC.html',
+    'progdash.html', 'AI.html', 'AD.html', 'ALabout.html',
+)
+
+static_pages = {}
+static_pages_lock = threading.Lock()
+
+def build_static_page(template):
+    body = render_template(template).encode('utf-8')
+    variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+def render_static_page(template):
+    """Serve a context-free template from the rendered-page cache.
+
+    Cached by template alone: none of these pages show flashed messages or
+    read the session, so serving one never loads the session either.
+    """
+    variants = static_pages.get(template)
+    if variants is None:
+        variants = build_static_page(template)
+        with static_pages_lock:
+            static_pages[template] = variants
+
+    encoding = next((name for name in ("br", "gzip")
+                     if name in variants and name in request.accept_encodings), "identity")
+    response = app.response_class(variants[encoding], mimetype='text/html')
+    if encoding != "identity":
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def warm_templates():
+    """Compile every template up front and pre-render the static pages"""
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.test_request_context():
+        for template in STATIC_PAGES:
+            try:
+                static_pages[template] = build_static_page(template)
+            except TemplateNotFound:
+                print(f"Static page template not found: {template}")
+
+@app.route('/')
+def index():
+    return render_static_page('index.html')
+
+@app.route('/studenthome')
+def home2():
+    return render_static_page('home2.html')
 
-    return render_template('SL.html')  # Return login page on GET request or failed login
+@app.route('/home')
+def home():
+    return render_static_page('home.html')
+
+@app.route('/student-login', methods=['GET', 'POST'])
+def student_login():
+    return handle_login('Student')
 
 
 
@@ -209,30 +1499,444 @@ def debug_questions():
 
 #eoftemp
 
+class AnswerKeyCache:
+    """Bounded LRU cache of qn_id -> {"corr_opt": ..., "options": {...}}.
+
+    Answer keys only change through the admin add/delete routes, which call
+    invalidate(), so grading can skip the aptitude_test lookup entirely once
+    a question has been served.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, cursor, qn_ids):
+        found = {}
+        missing = []
+        with self._lock:
+            for qn_id in qn_ids:
+                entry = self._entries.get(qn_id)
+                if entry is None:
+                    missing.append(qn_id)
+                else:
+                    self._entries.move_to_end(qn_id)
+                    found[qn_id] = entry
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            cursor.execute(
+                f"SELECT qn_id, options, corr_opt FROM aptitude_test WHERE qn_id IN ({placeholders})",
+                missing
+            )
+            for row in cursor.fetchall():
+                found[row['qn_id']] = self.put(row)
+        return found
+
+    def put(self, row):
+        options = row['options']
+        if isinstance(options, (str, bytes)):
+            options = json.loads(options)
+        entry = {"corr_opt": row['corr_opt'], "options": options}
+        with self._lock:
+            self._entries[row['qn_id']] = entry
+            self._entries.move_to_end(row['qn_id'])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, qn_id=None):
+        with self._lock:
+            if qn_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(qn_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+answer_key_cache = AnswerKeyCache(max_entries=int(os.getenv('ANSWER_KEY_CACHE_SIZE', 10000)))
+
+class QuestionStats:
+    """Per-question response statistics in parallel NumPy arrays.
+
+    Slot i holds one question: attempts, correct answers and the running sums
+    of answerer ability (x, x**2 and x for correct answers only) from which the
+    correct rate, difficulty and point-biserial discrimination are derived.
+    Difficulty is the smoothed log-odds of a wrong answer, on the same logit
+    scale as student ability. A difficulty-sorted copy of the slots is kept so
+    the next question is a binary search plus a short scan; it is re-sorted
+    after `resort_every` recorded answers rather than on each one.
+
+    load() rebuilds everything from `responses` in one vectorized pass: each
+    student's ability is the smoothed logit of their overall correct rate.
+    It is loaded in the background at startup and reloaded the same way
+    after `ttl` seconds, so questions and answers added by other worker
+    processes are picked up; the admin routes keep the local copy current
+    in between.
+    """
+
+    def __init__(self, ttl=900, window=8, resort_every=500, fetch_size=50000):
+        self.ttl = ttl
+        self.window = window
+        self.resort_every = resort_every
+        self.fetch_size = fetch_size
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._active = np.zeros(0, dtype=bool)
+        self._attempts = np.zeros(0, dtype=np.int64)
+        self._correct = np.zeros(0, dtype=np.int64)
+        self._sum_x = np.zeros(0)
+        self._sum_x2 = np.zeros(0)
+        self._sum_x_correct = np.zeros(0)
+        self._resort()
+        self._users = {}
+        self._loaded_at = None
+        self._expired = False
+        self._reloading = False
+        self._reloaded = threading.Condition(self._lock)
+        self.load_seconds = 0.0
+
+    def load(self, conn):
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT qn_id FROM aptitude_test ORDER BY qn_id")
+            ids = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+            cursor.execute("SELECT UserID, qn_id, score FROM responses")
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                chunks.append(np.array(rows, dtype=np.int64).reshape(-1, 3))
+        finally:
+            cursor.close()
+        responses = np.concatenate(chunks) if chunks else np.zeros((0, 3), dtype=np.int64)
+        user_ids, qn_ids = responses[:, 0], responses[:, 1]
+        scores = (responses[:, 2] > 0).astype(np.int64)
+
+        users, user_index = np.unique(user_ids, return_inverse=True)
+        answered = np.bincount(user_index, minlength=len(users))
+        right = np.bincount(user_index, weights=scores, minlength=len(users)).astype(np.int64)
+        ability = np.log((right + 1) / (answered - right + 1))[user_index]
+
+        # Responses to questions that no longer exist are ignored
+        n = len(ids)
+        slot = np.searchsorted(ids, qn_ids)
+        known = slot < n
+        known[known] = ids[slot[known]] == qn_ids[known]
+        slot, x, y = slot[known], ability[known], scores[known]
+
+        with self._lock:
+            self._ids = ids
+            self._slots = {int(qn_id): i for i, qn_id in enumerate(ids)}
+            self._active = np.ones(n, dtype=bool)
+            self._attempts = np.bincount(slot, minlength=n)
+            self._correct = np.bincount(slot, weights=y, minlength=n).astype(np.int64)
+            self._sum_x = np.bincount(slot, weights=x, minlength=n)
+            self._sum_x2 = np.bincount(slot, weights=x * x, minlength=n)
+            self._sum_x_correct = np.bincount(slot, weights=x * y, minlength=n)
+            self._users = {int(u): [int(a), int(r)] for u, a, r in zip(users, answered, right)}
+            self._resort()
+            self._loaded_at = time.monotonic()
+            self._expired = False
+        self.load_seconds = time.perf_counter() - started
+
+    def is_stale(self):
+        return (self._loaded_at is None or self._expired
+                or time.monotonic() - self._loaded_at > self.ttl)
+
+    def expire(self):
+        """Reload on next use, e.g. after a bulk import."""
+        self._expired = True
+
+    def refresh(self, wait=False, timeout=30):
+        """Reload in a background thread if stale; the current copy keeps serving.
+
+        Only one reload runs at a time. Before the first load has finished
+        there is nothing to serve, so callers may wait for it with wait=True.
+        """
+        with self._lock:
+            if not self._reloading and self.is_stale():
+                self._reloading = True
+                threading.Thread(target=self._reload, name='question-stats', daemon=True).start()
+            if wait and self._loaded_at is None:
+                self._reloaded.wait_for(lambda: not self._reloading, timeout)
+
+    def _reload(self):
+        conn = None
+        try:
+            conn = get_db_connection()
+            self.load(conn)
+        except Exception as e:
+            print(f"Question statistics load failed: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+            with self._lock:
+                self._reloading = False
+                self._reloaded.notify_all()
+
+    def _difficulty(self, slots=slice(None)):
+        wrong = self._attempts[slots] - self._correct[slots]
+        return np.log((wrong + 1) / (self._correct[slots] + 1))
+
+    def _discrimination(self, slots=slice(None)):
+        attempts = self._attempts[slots].astype(float)
+        correct = self._correct[slots].astype(float)
+        wrong = attempts - correct
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self._sum_x[slots] / attempts
+            sd = np.sqrt(np.maximum(self._sum_x2[slots] / attempts - mean * mean, 0.0))
+            mean_correct = self._sum_x_correct[slots] / correct
+            mean_wrong = (self._sum_x[slots] - self._sum_x_correct[slots]) / wrong
+            r = (mean_correct - mean_wrong) / sd * np.sqrt(correct * wrong) / attempts
+        return np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _resort(self):
+        difficulty = self._difficulty()
+        self._order = np.argsort(difficulty, kind='stable')
+        self._sorted_difficulty = difficulty[self._order]
+        self._weights = np.maximum(self._discrimination(), 0.05)
+        # pick() reads these through memoryviews: indexing one yields a plain
+        # Python number without creating a NumPy scalar each time
+        self._views = (memoryview(self._order), memoryview(self._sorted_difficulty),
+                       memoryview(self._weights), memoryview(self._ids), memoryview(self._active))
+        self._unsorted = 0
+
+    def add(self, qn_id):
+        with self._lock:
+            if self._loaded_at is None or qn_id in self._slots:
+                return
+            self._slots[qn_id] = len(self._ids)
+            self._ids = np.append(self._ids, qn_id)
+            self._active = np.append(self._active, True)
+            self._attempts = np.append(self._attempts, 0)
+            self._correct = np.append(self._correct, 0)
+            self._sum_x = np.append(self._sum_x, 0.0)
+            self._sum_x2 = np.append(self._sum_x2, 0.0)
+            self._sum_x_correct = np.append(self._sum_x_correct, 0.0)
+            self._resort()
+
+    def remove(self, qn_id):
+        with self._lock:
+            slot = self._slots.get(qn_id)
+            if slot is not None:
+                self._active[slot] = False
+
+    def ability(self, user_id):
+        """Starting estimate for a new test: the student's overall logit correct rate."""
+        with self._lock:
+            answered, right = self._users.get(user_id, (0, 0))
+        return math.log((right + 1) / (answered - right + 1))
+
+    def difficulty(self, qn_id):
+        with self._lock:
+            slot = self._slots.get(qn_id)
+            return 0.0 if slot is None else float(self._difficulty(slot))
+
+    def record(self, qn_id, user_id, correct, ability):
+        correct = 1 if correct else 0
+        with self._lock:
+            totals = self._users.setdefault(user_id, [0, 0])
+            totals[0] += 1
+            totals[1] += correct
+            slot = self._slots.get(qn_id)
+            if slot is None:
+                return
+            self._attempts[slot] += 1
+            self._correct[slot] += correct
+            self._sum_x[slot] += ability
+            self._sum_x2[slot] += ability * ability
+            self._sum_x_correct[slot] += ability * correct
+            self._unsorted += 1
+
+    def pick(self, ability, exclude=()):
+        """Choose an unseen question whose difficulty is close to `ability`.
+
+        Takes the `window` nearest active questions by difficulty and draws
+        one at random, weighted towards those that discriminate better.
+        """
+        with self._lock:
+            if self._unsorted >= self.resort_every:
+                self._resort()
+            order, sorted_difficulty, weights, ids, active = self._views
+            hi = bisect.bisect_left(sorted_difficulty, ability)
+            lo = hi - 1
+            candidates = []
+            while len(candidates) < self.window and (lo >= 0 or hi < len(order)):
+                if hi < len(order) and (lo < 0 or sorted_difficulty[hi] - ability <= ability - sorted_difficulty[lo]):
+                    slot = order[hi]
+                    hi += 1
+                else:
+                    slot = order[lo]
+                    lo -= 1
+                if active[slot] and ids[slot] not in exclude:
+                    candidates.append(slot)
+            if not candidates:
+                return None
+            slot = random.choices(candidates, weights=[weights[slot] for slot in candidates])[0]
+            return ids[slot]
+
+    def question_stats(self, limit=None, hardest=True):
+        with self._lock:
+            slots = np.flatnonzero(self._active & (self._attempts > 0))
+            difficulty = self._difficulty(slots)
+            discrimination = self._discrimination(slots)
+            attempts = self._attempts[slots]
+            correct = self._correct[slots]
+            ids = self._ids[slots]
+        order = np.argsort(-difficulty if hardest else difficulty, kind='stable')[:limit]
+        return [{
+            "qn_id": int(ids[i]),
+            "attempts": int(attempts[i]),
+            "correct_rate": round(float(correct[i] / attempts[i]), 4),
+            "difficulty": round(float(difficulty[i]), 4),
+            "discrimination": round(float(discrimination[i]), 4),
+        } for i in order]
+
+    def question_count(self):
+        with self._lock:
+            return int(self._active.sum())
+
+    def stats(self):
+        with self._lock:
+            attempts = int(self._attempts.sum())
+            return {
+                "questions": int(self._active.sum()),
+                "students": len(self._users),
+                "responses": attempts,
+                "correct_rate": round(int(self._correct.sum()) / attempts, 4) if attempts else 0.0,
+                "array_bytes": int(sum(a.nbytes for a in (
+                    self._ids, self._active, self._attempts, self._correct, self._sum_x,
+                    self._sum_x2, self._sum_x_correct, self._order, self._sorted_difficulty,
+                    self._weights))),
+                "load_seconds": round(self.load_seconds, 3),
+                "loaded": self._loaded_at is not None,
+            }
+
+
+question_stats = QuestionStats(
+    ttl=int(os.getenv('ADAPTIVE_STATS_TTL', 900)),
+    window=int(os.getenv('ADAPTIVE_PICK_WINDOW', 8)),
+    resort_every=int(os.getenv('ADAPTIVE_RESORT_EVERY', 500)),
+)
+
+APTITUDE_TEST_LENGTH = int(os.getenv('APTITUDE_TEST_LENGTH', 10))
+
+
+def update_ability(ability, answered, difficulty, correct):
+    """One step of the running ability estimate after an answer.
+
+    Moves the estimate by the surprise (observed minus expected correctness
+    under a Rasch model), with a step that shrinks as more answers come in.
+    """
+    expected = 1 / (1 + math.exp(difficulty - ability))
+    step = 1.0 / (1 + 0.25 * answered)
+    return ability + step * ((1 if correct else 0) - expected)
+
+
+def next_test_question(cursor, test):
+    """Pick and fetch the next question for the test in progress, or None."""
+    if len(test['served']) >= test['total']:
+        return None
+    for _ in range(3):
+        qn_id = question_stats.pick(test['ability'], exclude=set(test['served']))
+        if qn_id is None:
+            return None
+        cursor.execute("""
+            SELECT qn_id, qn_text, options, corr_opt,
+                   DATE_FORMAT(test_date, '%Y-%m-%d') AS test_date
+            FROM aptitude_test
+            WHERE qn_id = %s
+        """, (qn_id,))
+        row = cursor.fetchone()
+        if row:
+            break
+        # Deleted by another worker since the statistics were loaded
+        question_stats.remove(qn_id)
+    else:
+        return None
+    # Warm the answer-key cache for grading
+    row['options'] = answer_key_cache.put(row)['options']
+    test['served'].append(row['qn_id'])
+    test['current'] = row['qn_id']
+    return {
+        "qn_id": row['qn_id'],
+        "qn_text": row['qn_text'],
+        "options": row['options'],
+        "number": len(test['served']),
+    }
+
+
+def record_test_answer(cursor, qn_id, user_id, is_correct):
+    """Feed a graded answer to the question statistics and, if it answers the
+    current question of the student's adaptive test, move the test on.
+
+    Returns the fields to add to the /submit_answer response.
+    """
+    test = session.get('aptitude_test')
+    if not test or test.get('current') != qn_id:
+        question_stats.record(qn_id, user_id, is_correct, question_stats.ability(user_id))
+        return {}
+    question_stats.record(qn_id, user_id, is_correct, test['ability'])
+    test['ability'] = update_ability(test['ability'], test['answered'],
+                                     question_stats.difficulty(qn_id), is_correct)
+    test['answered'] += 1
+    test['current'] = None
+    next_question = next_test_question(cursor, test)
+    if next_question is None:
+        session.pop('aptitude_test', None)
+    else:
+        session['aptitude_test'] = test
+    return {
+        "next_question": next_question,
+        "ability": round(test['ability'], 3),
+        "progress": {"answered": test['answered'], "total": test['total']},
+    }
+
+
 @app.route('/student-at')
+@require_role('Student', redirect_to='student_login', message="Please login as student first")
 def student_at():
-    if 'loggedin' not in session or session.get('role') != 'Student':
-        flash("Please login as student first", "danger")
-        return redirect(url_for('student_login'))
-    
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
-        # Get 10 random questions with formatted dates
-        cursor.execute("""
-            SELECT qn_id, qn_text, options, corr_opt,
-                   DATE_FORMAT(test_date, '%Y-%m-%d') AS test_date 
-            FROM aptitude_test 
-            ORDER BY RAND() LIMIT 10
-        """)
-        questions = cursor.fetchall()
-        
-        # Convert options JSON to dict
-        for q in questions:
-            q['options'] = json.loads(q['options'])
+        question_stats.refresh(wait=True)
+
+        # Start an adaptive test at the student's current ability estimate;
+        # /submit_answer serves each following question
+        test = {
+            "ability": question_stats.ability(session['id']),
+            "answered": 0,
+            "served": [],
+            "current": None,
+            "total": min(APTITUDE_TEST_LENGTH, question_stats.question_count()),
+        }
+        question = next_test_question(cursor, test)
+        if question is None:
+            session.pop('aptitude_test', None)
+        else:
+            session['aptitude_test'] = test
         
-        return render_template('AT.html', questions=questions)
+        return render_template('AT.html', question=question, total=test['total'])
     
     finally:
         cursor.close()
@@ -240,19 +1944,130 @@ def student_at():
 
 @app.route('/student-cc')
 def student_cc():
-    return render_template('CC.html')
+    return render_static_page('CC.html')
 
 @app.route('/student-pd')
 def student_pd():
-    return render_template('progdash.html')
+    return render_static_page('progdash.html')
+
+# Per-user dashboard payloads; the write routes that feed the dashboard
+# invalidate the student's entry
+progress_cache = TTLCache(
+    max_entries=int(os.getenv('PROGRESS_CACHE_SIZE', 5000)),
+    ttl=int(os.getenv('PROGRESS_CACHE_TTL', 300))
+)
+
+# student_daily_progress holds per-day sums and counts for each dashboard
+# metric. Writes add to it inside their own transaction; deletes subtract.
+ROLLUP_UPSERT = """
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total), samples = samples + VALUES(samples)
+"""
+
+# Rebuild queries per metric, each selecting (user_id, day, metric, total, samples);
+# {sign} is '-' when the rows are being retracted
+ROLLUP_SOURCES = {
+    "aptitude": """
+        SELECT UserID, DATE(response_date), 'aptitude', {sign}SUM(score), {sign}COUNT(score)
+        FROM responses
+        WHERE {where}
+        GROUP BY UserID, DATE(response_date)
+    """,
+    "mockInterview": """
+        SELECT user_id, DATE(interview_date), 'mockInterview', {sign}SUM(rating), {sign}COUNT(rating)
+        FROM mock_interviews
+        WHERE rating IS NOT NULL AND user_id IS NOT NULL AND {where}
+        GROUP BY user_id, DATE(interview_date)
+    """,
+    "codingChallenge": """
+        SELECT user_id, DATE(submission_time), 'codingChallenge',
+               {sign}SUM(CASE WHEN status = 'Accepted' THEN 1 ELSE 0 END), {sign}COUNT(*)
+        FROM coding_submissions
+        WHERE {where}
+        GROUP BY user_id, DATE(submission_time)
+    """,
+}
+
+# Scores are shown as percentages; interview ratings are out of 5
+PROGRESS_SCALE = {"aptitude": 100, "mockInterview": 20, "codingChallenge": 100}
+
+def record_progress(cursor, user_id, day, metric, total, samples=1):
+    """Add to a student's daily rollup; runs inside the caller's transaction.
+
+    Pass day=None to use the database's CURDATE(), matching columns that
+    default to NOW().
+    """
+    cursor.execute(
+        "INSERT INTO student_daily_progress (user_id, day, metric, total, samples) "
+        "VALUES (%s, COALESCE(%s, CURDATE()), %s, %s, %s)" + ROLLUP_UPSERT,
+        (user_id, day, metric, total, samples)
+    )
+    progress_cache.invalidate(user_id)
+
+def retract_progress(cursor, metric, where, params):
+    """Subtract the rows matching `where` from the rollup before they are deleted"""
+    select = ROLLUP_SOURCES[metric].format(where=where, sign="-")
+    cursor.execute(
+        "INSERT INTO student_daily_progress (user_id, day, metric, total, samples) "
+        + select + ROLLUP_UPSERT,
+        params
+    )
+    progress_cache.invalidate()
+
+def interview_ratings(cursor, meeting_id):
+    cursor.execute("""
+        SELECT user_id, DATE(interview_date) AS day, rating
+        FROM mock_interviews
+        WHERE meeting_id = %s
+    """, (meeting_id,))
+    return [row if isinstance(row, dict) else dict(zip(cursor.column_names, row))
+            for row in cursor.fetchall()]
+
+def record_interview_rating_change(cursor, before, after):
+    """Move a rated interview in the rollup from its old state to its new one"""
+    for rows, sign in ((before, -1), (after, 1)):
+        for row in rows:
+            if row['user_id'] is not None and row['rating'] is not None:
+                record_progress(cursor, row['user_id'], row['day'], 'mockInterview',
+                                sign * row['rating'], sign)
+
+@app.cli.command('backfill-progress')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this student.')
+def backfill_progress(user_id):
+    """Rebuild student_daily_progress from responses, interviews and submissions."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if user_id is None:
+            cursor.execute("DELETE FROM student_daily_progress")
+        else:
+            cursor.execute("DELETE FROM student_daily_progress WHERE user_id = %s", (user_id,))
+        for metric, select in ROLLUP_SOURCES.items():
+            user_column = "UserID" if metric == "aptitude" else "user_id"
+            where, params = ("1=1", ()) if user_id is None else (f"{user_column} = %s", (user_id,))
+            cursor.execute(
+                "INSERT INTO student_daily_progress (user_id, day, metric, total, samples) "
+                + select.format(where=where, sign=""),
+                params
+            )
+            click.echo(f"{metric}: {cursor.rowcount} day rows")
+        conn.commit()
+        progress_cache.invalidate()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
 @app.route('/api/student/progress')
+@require_role()
 def get_student_progress():
-    if 'id' not in session:
-        return jsonify({"error": "Not logged in"}), 401
-    
     user_id = session['id']
     
+    cached = progress_cache.get(user_id)
+    if cached is not None:
+        return jsonify(cached)
+    
     try:
         conn = get_db_connection()
         if not conn:
@@ -267,114 +2082,40 @@ def get_student_progress():
             "codingChallenge": {"latestScore": 0, "history": [], "dates": []}
         }
         
-        # Fixed Aptitude Query
-        try:
-            cursor.execute("""
-                SELECT 
-                    DATE(response_date) as test_date,
-                    AVG(score*100) as avg_score
-                FROM responses
-                WHERE UserID = %s
-                GROUP BY test_date
-                ORDER BY test_date ASC
-            """, (user_id,))
-            
-            aptitude_results = cursor.fetchall()
-            if aptitude_results:
-                response["aptitude"]["history"] = [
-                    float(result['avg_score']) if result['avg_score'] is not None else 0 
-                    for result in aptitude_results
-                ]
-                response["aptitude"]["dates"] = [
-                    result['test_date'].strftime('%Y-%m-%d') 
-                    if hasattr(result['test_date'], 'strftime')
-                    else str(result['test_date']) 
-                    for result in aptitude_results
-                ]
-                
-                cursor.execute("SELECT AVG(score*100) as latest_score FROM responses WHERE UserID = %s", (user_id,))
-                latest_aptitude = cursor.fetchone()
-                if latest_aptitude and latest_aptitude['latest_score'] is not None:
-                    response["aptitude"]["latestScore"] = round(float(latest_aptitude['latest_score']), 1)
-        except Exception as e:
-            print(f"Aptitude query error: {e}")
-            # Keep default values if error occurs
-        
-        # Get mock interview ratings with null checks
-        try:
-            cursor.execute("""
-                SELECT rating, DATE(interview_date) as interview_date
-                FROM mock_interviews
-                WHERE user_id = %s AND rating IS NOT NULL
-                ORDER BY interview_date ASC
-            """, (user_id,))
-            
-            interview_results = cursor.fetchall()
-            if interview_results:
-                response["mockInterview"]["history"] = [float(result['rating']) * 20 if result['rating'] is not None else 0
-                                                      for result in interview_results]
-                response["mockInterview"]["dates"] = [result['interview_date'].strftime('%Y-%m-%d') if hasattr(result['interview_date'], 'strftime')
-                                                    else str(result['interview_date'])
-                                                    for result in interview_results]
-                
-                cursor.execute("""
-                    SELECT AVG(rating) as latest_score
-                    FROM mock_interviews
-                    WHERE user_id = %s AND rating IS NOT NULL
-                """, (user_id,))
-                latest_interview = cursor.fetchone()
-                if latest_interview and latest_interview['latest_score'] is not None:
-                    response["mockInterview"]["latestScore"] = round(float(latest_interview['latest_score']) * 20, 1)
-        except Exception as e:
-            print(f"Mock interview query error: {e}")
-            # Keep default values if error occurs
-        
-        # Get coding challenge success rate with null checks
-        try:
-            cursor.execute("""
-                SELECT 
-                    DATE(submission_time) as submission_date,
-                    (SUM(CASE WHEN status = 'Accepted' THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0)) * 100 as success_rate
-                FROM coding_submissions
-                WHERE user_id = %s
-                GROUP BY DATE(submission_time)
-                ORDER BY submission_date ASC
-            """, (user_id,))
-            
-            coding_results = cursor.fetchall()
-            if coding_results:
-                response["codingChallenge"]["history"] = [float(result['success_rate']) if result['success_rate'] is not None else 0
-                                                        for result in coding_results]
-                response["codingChallenge"]["dates"] = [result['submission_date'].strftime('%Y-%m-%d') if hasattr(result['submission_date'], 'strftime')
-                                                      else str(result['submission_date'])
-                                                      for result in coding_results]
-                
-                cursor.execute("""
-                    SELECT 
-                        (SUM(CASE WHEN status = 'Accepted' THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0)) * 100 as overall_success_rate
-                    FROM coding_submissions
-                    WHERE user_id = %s
-                """, (user_id,))
-                coding_overall = cursor.fetchone()
-                if coding_overall and coding_overall['overall_success_rate'] is not None:
-                    response["codingChallenge"]["latestScore"] = round(float(coding_overall['overall_success_rate']), 1)
-        except Exception as e:
-            print(f"Coding challenge query error: {e}")
-            # Keep default values if error occurs
-        
-        # Check if any data was found
-        data_found = (
-            response["aptitude"]["latestScore"] is not None or 
-            response["mockInterview"]["latestScore"] is not None or
-            response["codingChallenge"]["latestScore"] is not None
-        )
-        
-        if not data_found:
-            print("No data found for user ID:", user_id)
+        # Everything comes from the daily rollup, so cost does not grow with
+        # the length of a student's history
+        cursor.execute("""
+            SELECT metric, day, total, samples
+            FROM student_daily_progress
+            WHERE user_id = %s AND samples > 0
+            ORDER BY metric, day
+        """, (user_id,))
+        rows = cursor.fetchall()
         
         cursor.close()
         conn.close()
         
+        totals = {metric: [0.0, 0] for metric in response}
+        for row in rows:
+            metric = row['metric']
+            if metric not in response:
+                continue
+            total = float(row['total'] or 0)
+            samples = int(row['samples'] or 0)
+            day = row['day']
+            response[metric]["history"].append(total / samples * PROGRESS_SCALE[metric] if samples else 0)
+            response[metric]["dates"].append(
+                day.strftime('%Y-%m-%d') if hasattr(day, 'strftime') else str(day)
+            )
+            totals[metric][0] += total
+            totals[metric][1] += samples
+        
+        # Overall averages come straight from the daily buckets
+        for metric, (total, samples) in totals.items():
+            if samples:
+                response[metric]["latestScore"] = round(total / samples * PROGRESS_SCALE[metric], 1)
+        
+        progress_cache.put(user_id, response)
         return jsonify(response)
         
     except Exception as e:
@@ -385,38 +2126,364 @@ def get_student_progress():
         }), 500
 
 
+# ----- Leaderboards -----
+# Each metric's standing is the same overall score the dashboard shows
+# (sum of totals / sum of samples, scaled to 0-100). Scores are bucketed at
+# LEADERBOARD_RESOLUTION steps per point and counted in a Fenwick tree, so
+# rank and percentile are O(log n) and a score change is two tree updates.
+# Students tied within one bucket share a rank.
+
+LEADERBOARD_MIN_SAMPLES = int(os.getenv('LEADERBOARD_MIN_SAMPLES', 5))
+LEADERBOARD_RESOLUTION = int(os.getenv('LEADERBOARD_RESOLUTION', 10))
+LEADERBOARD_REBUILD_TTL = int(os.getenv('LEADERBOARD_REBUILD_TTL', 600))
+LEADERBOARD_MAX_LIMIT = 100
+
+class Leaderboard:
+    """Ranked scores for one metric. Not thread-safe; Leaderboards locks it."""
+
+    def __init__(self, scale, min_samples=LEADERBOARD_MIN_SAMPLES, resolution=LEADERBOARD_RESOLUTION):
+        self.scale = scale
+        self.min_samples = min_samples
+        self.resolution = resolution
+        self.buckets = 100 * resolution + 1
+        self._tree = [0] * (self.buckets + 1)
+        self._members = {}   # bucket -> set of user ids
+        self._users = {}     # user id -> [total, samples, bucket or None]
+        self.ranked = 0
+
+    def score(self, total, samples):
+        return total / samples * self.scale if samples else 0.0
+
+    def _bucket(self, total, samples):
+        return min(max(round(self.score(total, samples) * self.resolution), 0), self.buckets - 1)
+
+    def _add(self, bucket, delta):
+        i = bucket + 1
+        while i <= self.buckets:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _at_or_below(self, bucket):
+        count = 0
+        i = bucket + 1
+        while i > 0:
+            count += self._tree[i]
+            i -= i & -i
+        return count
+
+    def update(self, user_id, total, samples):
+        """Add a student's new results (negative values retract them)"""
+        entry = self._users.setdefault(user_id, [0, 0, None])
+        if entry[2] is not None:
+            self._add(entry[2], -1)
+            members = self._members[entry[2]]
+            members.discard(user_id)
+            if not members:
+                del self._members[entry[2]]
+            self.ranked -= 1
+        entry[0] += total
+        entry[1] += samples
+        entry[2] = None
+        if entry[1] >= max(self.min_samples, 1):
+            entry[2] = self._bucket(entry[0], entry[1])
+            self._add(entry[2], 1)
+            self._members.setdefault(entry[2], set()).add(user_id)
+            self.ranked += 1
+
+    def rank(self, user_id):
+        total, samples, bucket = self._users.get(user_id, (0, 0, None))
+        standing = {
+            "score": round(self.score(total, samples), 1),
+            "samples": samples,
+            "ranked_students": self.ranked,
+        }
+        if bucket is None:
+            standing.update({"rank": None, "percentile": None,
+                             "samples_needed": max(self.min_samples - samples, 0)})
+            return standing
+        higher = self.ranked - self._at_or_below(bucket)
+        tied = len(self._members[bucket])
+        below = self.ranked - higher - tied
+        standing.update({
+            "rank": higher + 1,
+            # Percentile rank: share of students below, counting ties as half
+            "percentile": round(100 * (below + tied / 2) / self.ranked, 1),
+        })
+        return standing
+
+    def top(self, limit):
+        items = []
+        for bucket in sorted(self._members, reverse=True):
+            rank = len(items) + 1
+            tied = sorted(self._members[bucket],
+                          key=lambda user_id: (-self.score(*self._users[user_id][:2]),
+                                           -self._users[user_id][1], user_id))
+            for user_id in tied:
+                total, samples, _ = self._users[user_id]
+                items.append({"rank": rank, "user_id": user_id,
+                              "score": round(self.score(total, samples), 1), "samples": samples})
+            if len(items) >= limit:
+                break
+        return items[:limit]
+
+
+class Leaderboards:
+    """Per-metric leaderboards, fed by the answer and code submission routes.
+
+    Rebuilt from student_daily_progress on first use and then in a background
+    thread every `ttl` seconds, which also folds in writes made by other
+    worker processes and by the edit/delete routes. Only one rebuild runs at
+    a time; updates that arrive while it is running are replayed onto the new
+    boards before they are swapped in.
+    """
+
+    def __init__(self, ttl=LEADERBOARD_REBUILD_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rebuilt = threading.Condition(self._lock)
+        self._boards = None
+        self._loaded_at = None
+        self._replay = None
+        self._rebuilding = False
+        self.rebuilds = 0
+        self.rebuild_seconds = 0.0
+
+    def _new_boards(self):
+        return {metric: Leaderboard(scale) for metric, scale in PROGRESS_SCALE.items()}
+
+    def _build(self):
+        with self._lock:
+            self._replay = []
+        started = time.perf_counter()
+        boards = self._new_boards()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT user_id, metric, SUM(total), SUM(samples)
+                FROM student_daily_progress
+                GROUP BY user_id, metric
+            """)
+            for user_id, metric, total, samples in cursor.fetchall():
+                if metric in boards and samples:
+                    boards[metric].update(user_id, float(total or 0), int(samples))
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        with self._lock:
+            for args in self._replay:
+                boards[args[1]].update(args[0], *args[2:])
+            self._replay = None
+            self._boards = boards
+            self._loaded_at = time.monotonic()
+            self.rebuilds += 1
+            self.rebuild_seconds = time.perf_counter() - started
+
+    def _start_rebuild(self):
+        """Start a background rebuild unless one is running; caller holds _lock"""
+        if not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, name='leaderboard-rebuild',
+                             daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            self._build()
+        except Exception as e:
+            print(f"Leaderboard rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._rebuilt.notify_all()
+
+    def _wait_for_boards(self):
+        """Wait for the running rebuild; caller holds _lock"""
+        self._rebuilt.wait_for(lambda: not self._rebuilding)
+        if self._boards is None:
+            raise RuntimeError("Leaderboard rebuild failed")
+
+    def rebuild(self):
+        """Rebuild now, joining a rebuild that is already running"""
+        with self._lock:
+            self._start_rebuild()
+            self._wait_for_boards()
+
+    def refresh(self):
+        """Load the boards if needed; a stale copy keeps serving while it is rebuilt."""
+        with self._lock:
+            if self._boards is None:
+                self._start_rebuild()
+                self._wait_for_boards()
+            elif time.monotonic() - self._loaded_at > self.ttl:
+                self._start_rebuild()
+
+    def record(self, user_id, metric, total, samples=1):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((user_id, metric, total, samples))
+            if self._boards is not None:
+                self._boards[metric].update(user_id, total, samples)
+
+    def top(self, metric, limit):
+        self.refresh()
+        with self._lock:
+            return self._boards[metric].top(limit)
+
+    def standing(self, user_id):
+        self.refresh()
+        with self._lock:
+            return {metric: board.rank(user_id) for metric, board in self._boards.items()}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ranked": {metric: board.ranked for metric, board in (self._boards or {}).items()},
+                "rebuilds": self.rebuilds,
+                "rebuild_seconds": round(self.rebuild_seconds, 3),
+                "rebuilding": self._rebuilding,
+            }
+
+
+leaderboards = Leaderboards()
+
+@app.route('/api/leaderboard')
+@require_role()
+def get_leaderboard():
+    metric = request.args.get('metric', 'aptitude')
+    if metric not in PROGRESS_SCALE:
+        return jsonify({"error": f"metric must be one of {', '.join(PROGRESS_SCALE)}"}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), LEADERBOARD_MAX_LIMIT)
+    try:
+        items = leaderboards.top(metric, limit)
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for item in items:
+                item['you'] = item['user_id'] == session['id']
+            attach_user_names(cursor, items, {'user_id': 'name'})
+        finally:
+            cursor.close()
+            conn.close()
+        return jsonify({"metric": metric, "items": items})
+    except Exception as e:
+        print(f"Leaderboard error: {e}")
+        return jsonify({"error": "Failed to fetch leaderboard", "details": str(e)}), 500
+
+@app.route('/api/leaderboard/me')
+@require_role()
+def get_my_rank():
+    try:
+        return jsonify(leaderboards.standing(session['id']))
+    except Exception as e:
+        print(f"Leaderboard error: {e}")
+        return jsonify({"error": "Failed to fetch rank", "details": str(e)}), 500
+
+@app.route('/admin/leaderboards/rebuild', methods=['POST'])
+@require_role('Admin')
+def admin_rebuild_leaderboards():
+    leaderboards.rebuild()
+    return jsonify({"success": True, **leaderboards.stats()})
+
 @app.route('/student-ai')
 def student_ai():
-    return render_template('AI.html')
+    return render_static_page('AI.html')
 
-@app.route('/student-qna')
-def student_qna():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+QNA_PAGE_SIZE = int(os.getenv('QNA_PAGE_SIZE', 20))
 
-    cursor.execute("""
-        SELECT q.id, q.question_text, q.created_at, u.Name AS student_name,
-               COALESCE(a.answer_text, '') AS answer_text, a.created_at AS answer_date, ua.Name AS alumni_name
-        FROM questions q
-        JOIN Users u ON q.user_id = u.UserID
+def encode_qna_cursor(created_at, question_id):
+    raw = f"{created_at.isoformat()}|{question_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_qna_cursor(token):
+    """Return (created_at, id) from a feed cursor, or None if it is malformed"""
+    try:
+        created_at, question_id = base64.urlsafe_b64decode(token.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(created_at), int(question_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def fetch_qna_page(cursor, after=None, limit=QNA_PAGE_SIZE):
+    """Fetch one page of questions (newest first) with their answers.
+
+    Pages are keyed on (created_at, id) so each one is an index range scan
+    no matter how deep the reader has scrolled. Returns (rows, next_cursor).
+    """
+    where = ""
+    params = []
+    if after:
+        where = "WHERE created_at < %s OR (created_at = %s AND id < %s)"
+        params = [after[0], after[0], after[1]]
+
+    cursor.execute(f"""
+        SELECT q.id, q.question_text, q.created_at, q.user_id,
+               COALESCE(a.answer_text, '') AS answer_text, a.created_at AS answer_date, a.user_id AS answer_user_id
+        FROM (
+            SELECT id, user_id, question_text, created_at
+            FROM questions
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        ) q
         LEFT JOIN answers a ON q.id = a.question_id
-        LEFT JOIN Users ua ON a.user_id = ua.UserID
-        ORDER BY q.created_at DESC
-    """)
-    
-    qna_data = cursor.fetchall()
+        ORDER BY q.created_at DESC, q.id DESC
+    """, params + [limit + 1])
+    rows = cursor.fetchall()
+
+    # One extra question was fetched to tell whether another page exists
+    question_ids = list(dict.fromkeys(row['id'] for row in rows))
+    next_cursor = None
+    if len(question_ids) > limit:
+        rows = [row for row in rows if row['id'] != question_ids[limit]]
+        last = next(row for row in rows if row['id'] == question_ids[limit - 1])
+        next_cursor = encode_qna_cursor(last['created_at'], last['id'])
+    attach_user_names(cursor, rows, {'user_id': 'student_name', 'answer_user_id': 'alumni_name'})
+    return rows, next_cursor
+
+def render_qna_page(template):
+    after = decode_qna_cursor(request.args.get('cursor', ''))
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    qna_data, next_cursor = fetch_qna_page(cursor, after)
     cursor.close()
     conn.close()
+    return render_template(template, qna=qna_data, next_cursor=next_cursor)
+
+@app.route('/student-qna')
+def student_qna():
+    return render_qna_page('Q&A.html')
 
-    return render_template('Q&A.html', qna=qna_data)
+@app.route('/api/qna')
+def qna_feed():
+    """JSON page of the Q&A feed for infinite scroll"""
+    token = request.args.get('cursor')
+    after = decode_qna_cursor(token) if token else None
+    if token and after is None:
+        return jsonify({"error": "Invalid cursor"}), 400
+    limit = min(max(request.args.get('limit', QNA_PAGE_SIZE, type=int), 1), 100)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        rows, next_cursor = fetch_qna_page(cursor, after, limit)
+    finally:
+        cursor.close()
+        conn.close()
+
+    for item in rows:
+        if item['created_at']:
+            item['created_at'] = item['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+        if item.get('answer_date'):
+            item['answer_date'] = item['answer_date'].strftime('%Y-%m-%d %H:%M:%S')
+    return jsonify({"items": rows, "next_cursor": next_cursor})
 
 
 @app.route('/ask-question', methods=['POST'])
+@require_role('Student', redirect_to='student_qna', message="Only students can ask questions.")
 def ask_question():
-    if 'loggedin' not in session or session.get('role') != 'Student':
-        flash("Only students can ask questions.", "danger")
-        return redirect(url_for('student_qna'))
-
     question_text = request.form.get('question')
     if not question_text:
         flash("Question cannot be empty.", "danger")
@@ -435,11 +2502,8 @@ def ask_question():
     flash("Your question has been posted!", "success")
     return redirect(url_for('student_qna'))
 @app.route('/answer-question/<int:question_id>', methods=['POST'])
+@require_role('Alumni', redirect_to='alumni_qna', message="Only alumni can answer questions.")
 def answer_question(question_id):
-    if 'loggedin' not in session or session.get('role') != 'Alumni':
-        flash("Only alumni can answer questions.", "danger")
-        return redirect(url_for('alumni_qna'))
-
     answer_text = request.form.get('answer')
     if not answer_text:
         flash("Answer cannot be empty.", "danger")
@@ -463,41 +2527,106 @@ def answer_question(question_id):
 
 @app.route('/student-ad')
 def student_ad():
-    return render_template('AD.html')
+    return render_static_page('AD.html')
+
+class AlumniDirectory:
+    """In-memory snapshot of the alumni directory.
+
+    Rows are kept as plain tuples (with repeated company/designation strings
+    interned) and rebuilt after `ttl` seconds or when register() adds an
+    alumnus.
+    """
+
+    FIELDS = ("UserID", "name", "grad_year", "company", "designation", "bio")
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._rows = ()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def snapshot(self):
+        """Return the rows, reloading from the database if stale"""
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._rows
+
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT u.UserID, u.Name, a.grad_year, a.company, a.designation, a.bio
+                    FROM alumni a
+                    JOIN Users u ON a.UserID = u.UserID
+                    ORDER BY a.grad_year DESC
+                """)
+                rows = tuple(
+                    (user_id, name, grad_year,
+                     sys.intern(company) if company else company,
+                     sys.intern(designation) if designation else designation,
+                     bio)
+                    for user_id, name, grad_year, company, designation, bio in cursor.fetchall()
+                )
+            finally:
+                cursor.close()
+                conn.close()
+
+            self._rows = rows
+            self._loaded_at = time.monotonic()
+            return self._rows
+
+
+alumni_directory = AlumniDirectory(ttl=int(os.getenv('ALUMNI_DIRECTORY_TTL', 600)))
+
+def grad_year_of(row):
+    try:
+        return int(row[2])
+    except (TypeError, ValueError):
+        return None
 
 @app.route('/get_alumni')
+@cached_response('alumni', cache_control=f'public, max-age={RESPONSE_MAX_AGE}')
 def get_alumni():
+    """Paginated alumni directory.
+
+    Query params: page, per_page, grad_year_min, grad_year_max, company
+    (case-insensitive match) and designation (case-insensitive substring).
+    """
     try:
-        # Connect using your existing get_db_connection() function
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Updated query to match your actual schema:
-        # - Uses Users table which we know exists (from your register route)
-        # - Matches the alumni table structure you showed
-        query = """
-        SELECT 
-            u.UserID,
-            u.Name as name,
-            a.grad_year,
-            a.company,
-            a.designation,
-            a.bio
-        FROM alumni a
-        JOIN Users u ON a.UserID = u.UserID
-        ORDER BY a.grad_year DESC
-        """
-        
-        cursor.execute(query)
-        alumni_data = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        # Enhanced response with success flag
+        rows = alumni_directory.snapshot()
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        year_min = request.args.get('grad_year_min', type=int)
+        year_max = request.args.get('grad_year_max', type=int)
+        company = request.args.get('company', '').strip().lower()
+        designation = request.args.get('designation', '').strip().lower()
+
+        matches = rows
+        if year_min is not None or year_max is not None:
+            matches = [row for row in matches
+                       if grad_year_of(row) is not None
+                       and (year_min is None or grad_year_of(row) >= year_min)
+                       and (year_max is None or grad_year_of(row) <= year_max)]
+        if company:
+            matches = [row for row in matches if (row[3] or '').lower() == company]
+        if designation:
+            matches = [row for row in matches if designation in (row[4] or '').lower()]
+
+        start = (page - 1) * per_page
+        alumni_data = [dict(zip(AlumniDirectory.FIELDS, row)) for row in matches[start:start + per_page]]
+
         return jsonify({
             "success": True,
-            "data": alumni_data
+            "data": alumni_data,
+            "page": page,
+            "per_page": per_page,
+            "total": len(matches),
+            "has_more": start + per_page < len(matches)
         })
     
     except mysql.connector.Error as e:
@@ -516,147 +2645,156 @@ def get_alumni():
 
 @app.route('/about')
 def about():
-    return render_template('about.html')
+    return render_static_page('about.html')
 
 @app.route('/alumni-login', methods=['GET', 'POST'])
 def alumni_login():
-    if request.method == 'POST':
-        email = request.form['alumniEmail']
-        password = request.form['alumniPassword']
-
-        # Validate if email ends with '@rajagiri.edu.in'
-        if not email.endswith('@rajagiri.edu.in'):
-            flash("Alumni must use an email ending with @rajagiri.edu.in", "danger")
-            return redirect(url_for('alumni_login'))
-
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("SELECT * FROM Users WHERE Email = %s", (email,))
-        user = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
-
-        if user and bcrypt.check_password_hash(user['Password'], password):  # Check password
-            if user['Role'] == 'Alumni':  # Ensure it's an Alumni
-                session['loggedin'] = True
-                session['id'] = user['UserID']
-                session['email'] = user['Email']
-                session['role'] = user['Role']
-
-                flash("Login successful!", "success")
-                return redirect(url_for('home3'))  # Redirect to alumni dashboard
-            else:
-                flash("You are not registered as an Alumni.", "danger")
-        else:
-            flash("Invalid email or password", "danger")
-
-    return render_template('AL.html')  # Render Alumni Login page
+    return handle_login('Alumni')
 
 @app.route('/alumnihome')
+@require_role('Alumni', redirect_to='alumni_login')
 def home3():
-    if 'loggedin' in session and session.get('role') == 'Alumni':
-        return render_template('home3.html')  # ✅ Ensure alumni get a dedicated homepage
-    else:
-        flash("Unauthorized access!", "danger")
-        return redirect(url_for('alumni_login'))  # Redirect to login if not logged in
-
-
-@app.route('/alumni-qna')
-def alumni_qna():
-    # This route needs to fetch the Q&A data just like the student_qna route
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    return render_template('home3.html')  # ✅ Ensure alumni get a dedicated homepage
 
-    cursor.execute("""
-        SELECT q.id, q.question_text, q.created_at, u.Name AS student_name,
-               COALESCE(a.answer_text, '') AS answer_text, a.created_at AS answer_date, ua.Name AS alumni_name
-        FROM questions q
-        JOIN Users u ON q.user_id = u.UserID
-        LEFT JOIN answers a ON q.id = a.question_id
-        LEFT JOIN Users ua ON a.user_id = ua.UserID
-        ORDER BY q.created_at DESC
-    """)
-    
-    qna_data = cursor.fetchall()
-    cursor.close()
-    conn.close()
 
-    return render_template('alqna.html', qna=qna_data)  # Pass the data to the template
+@app.route('/alumni-qna')
+def alumni_qna():
+    # Same feed as student_qna, rendered with answer forms
+    return render_qna_page('alqna.html')
 
 from flask import request, jsonify
 
 @app.route('/admin/qna')
+@require_role('Admin', redirect_to='admin_login', message="Unauthorized access")
 def admin_qna():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        flash("Unauthorized access", "danger")
-        return redirect(url_for('login'))
     return render_template('AdminQNA.html')
 
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default)
+FULLTEXT_MIN_TOKEN = int(os.getenv('FULLTEXT_MIN_TOKEN', 3))
+
+def search_terms(search_query):
+    return [term.lower() for term in re.findall(r"\w+", search_query)]
+
+def highlight_terms(text, terms):
+    """HTML-escape text and wrap words starting with any search term in <mark>"""
+    if not text:
+        return ""
+    if not terms:
+        return str(escape(text))
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(str(escape(text[last:match.start()])))
+        parts.append(f"<mark>{escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(str(escape(text[last:])))
+    return "".join(parts)
+
 @app.route('/admin/get_qnas')
+@require_role('Admin')
 def admin_get_qnas():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({'error': 'Unauthorized'}), 401
-
     try:
         search_query = request.args.get('search', '').strip()
         status_filter = request.args.get('status', 'all')
-        sort_order = request.args.get('sort', 'newest')
+        sort_order = request.args.get('sort', 'relevance' if search_query else 'newest')
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
 
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query = """
-            SELECT q.id, q.question_text, q.created_at, 
-                   u.Name as student_name, 
-                   a.answer_text, a.created_at as answer_date,
-                   ua.Name as alumni_name
+        terms = search_terms(search_query)
+        fulltext_terms = [term for term in terms if len(term) >= FULLTEXT_MIN_TOKEN]
+
+        joins = """
             FROM questions q
-            JOIN Users u ON q.user_id = u.UserID
             LEFT JOIN answers a ON q.id = a.question_id
-            LEFT JOIN Users ua ON a.user_id = ua.UserID
-            WHERE 1=1
         """
-
+        relevance = "0"
         params = []
-        if search_query:
-            query += " AND q.question_text LIKE %s"
-            params.append(f"%{search_query}%")
+        where = " WHERE 1=1"
+
+        if fulltext_terms:
+            # Score questions and answers through their FULLTEXT indexes, then
+            # join the matching question ids; every term must match (prefix search)
+            boolean_query = " ".join(f"+{term}*" for term in fulltext_terms)
+            joins += """
+            JOIN (
+                SELECT id, SUM(score) AS relevance
+                FROM (
+                    SELECT id, MATCH(question_text) AGAINST (%s IN BOOLEAN MODE) AS score
+                    FROM questions
+                    WHERE MATCH(question_text) AGAINST (%s IN BOOLEAN MODE)
+                    UNION ALL
+                    SELECT question_id AS id, MATCH(answer_text) AGAINST (%s IN BOOLEAN MODE) AS score
+                    FROM answers
+                    WHERE MATCH(answer_text) AGAINST (%s IN BOOLEAN MODE)
+                ) hits
+                GROUP BY id
+            ) m ON m.id = q.id
+            """
+            params.extend([boolean_query] * 4)
+            relevance = "m.relevance"
+        elif terms:
+            # Words too short for the full-text index fall back to a substring scan
+            where += " AND (q.question_text LIKE %s OR a.answer_text LIKE %s)"
+            params.extend([f"%{search_query}%"] * 2)
 
         if status_filter == 'answered':
-            query += " AND a.answer_text IS NOT NULL"
+            where += " AND a.answer_text IS NOT NULL"
         elif status_filter == 'pending':
-            query += " AND a.answer_text IS NULL"
-
-        if sort_order == 'newest':
-            query += " ORDER BY q.created_at DESC"
+            where += " AND a.answer_text IS NULL"
+
+        cursor.execute("SELECT COUNT(*) AS total " + joins + where, params)
+        total = cursor.fetchone()['total']
+
+        # Without full-text terms there is no score to rank by
+        if sort_order == 'relevance' and not fulltext_terms:
+            sort_order = 'newest'
+        if sort_order == 'relevance':
+            order = f" ORDER BY {relevance} DESC, q.created_at DESC"
+        elif sort_order == 'newest':
+            order = " ORDER BY q.created_at DESC"
         else:
-            query += " ORDER BY q.created_at ASC"
+            order = " ORDER BY q.created_at ASC"
 
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        cursor.execute(f"""
+            SELECT q.id, q.question_text, q.created_at, q.user_id,
+                   a.answer_text, a.created_at as answer_date,
+                   a.user_id AS answer_user_id,
+                   {relevance} AS relevance
+        """ + joins + where + order + " LIMIT %s OFFSET %s", params + [per_page, (page - 1) * per_page])
+        results = attach_user_names(cursor, cursor.fetchall(),
+                                    {'user_id': 'student_name', 'answer_user_id': 'alumni_name'})
 
-        # Format dates for JSON serialization
+        # Format dates for JSON serialization and mark the matched words
         for item in results:
             if item['created_at']:
                 item['created_at'] = item['created_at'].strftime('%Y-%m-%d %H:%M:%S')
             if item.get('answer_date'):
                 item['answer_date'] = item['answer_date'].strftime('%Y-%m-%d %H:%M:%S')
+            item['relevance'] = float(item['relevance'] or 0)
+            item['question_highlight'] = highlight_terms(item['question_text'], terms)
+            item['answer_highlight'] = highlight_terms(item['answer_text'], terms)
 
         cursor.close()
         conn.close()
 
-        return jsonify(results)
+        return jsonify({
+            "items": results,
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "has_more": page * per_page < total
+        })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/admin/delete_qa', methods=['POST'])
+@require_role('Admin')
 def admin_delete_qa():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
-
     try:
         qa_id = request.form.get('qa_id')
         delete_type = request.form.get('type')  # 'question' or 'answer'
@@ -687,79 +2825,77 @@ def admin_delete_qa():
 
 @app.route('/alumni-about')
 def alumni_about():
-    return render_template('ALabout.html')
+    return render_static_page('ALabout.html')
 
 
 
 @app.route('/admin-login', methods=['GET', 'POST'])
 def admin_login():
-    if request.method == 'POST':
-        email = request.form['adminEmail']
-        password = request.form['adminPassword']
-
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("SELECT * FROM Users WHERE Email = %s", (email,))
-        user = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
-
-        if user and bcrypt.check_password_hash(user['Password'], password):  # Check password
-            if user['Role'] == 'Admin':  # Ensure it's an Admin
-                session['loggedin'] = True
-                session['id'] = user['UserID']
-                session['email'] = user['Email']
-                session['role'] = user['Role']
-
-                flash("Admin login successful!", "success")
-                return redirect(url_for('admin_dashboard'))  # Redirect to admin dashboard
-            else:
-                flash("You are not registered as an Admin.", "danger")
-        else:
-            flash("Invalid email or password", "danger")
-
-    return render_template('ADL.html')
+    return handle_login('Admin')
+
+@app.route('/admin/db-pool-stats')
+@require_role('Admin')
+def admin_db_pool_stats():
+    return jsonify(db_pool.stats())
+
+@app.route('/admin/session-stats')
+@require_role('Admin')
+def admin_session_stats():
+    if isinstance(app.session_interface, ServerSideSessionInterface):
+        return jsonify(app.session_interface.stats())
+    return jsonify({"backend": "cookie"})
+
+@app.route('/admin/cache-stats')
+@require_role('Admin')
+def admin_cache_stats():
+    return jsonify({
+        "analytics": analytics.stats(),
+        "answer_keys": answer_key_cache.stats(),
+        "code_results": code_result_cache.stats(),
+        "leaderboards": leaderboards.stats(),
+        "progress": progress_cache.stats(),
+        "question_stats": question_stats.stats(),
+        "responses": response_cache.stats(),
+        "user_profiles": user_profiles.stats(),
+    })
+
+@app.route('/admin/question-stats')
+@require_role('Admin')
+def admin_question_stats():
+    """Per-question attempts, correct rate, difficulty and discrimination.
+
+    ?order=hardest|easiest (default hardest) and ?limit=N (default 50)
+    """
+    order = request.args.get('order', 'hardest')
+    if order not in ('hardest', 'easiest'):
+        return jsonify({"success": False, "error": "order must be hardest or easiest"}), 400
+    limit = request.args.get('limit', 50, type=int)
+    question_stats.refresh(wait=True)
+    return jsonify({
+        "summary": question_stats.stats(),
+        "questions": question_stats.question_stats(limit=max(limit, 1), hardest=order == 'hardest'),
+    })
 
 @app.route('/admin-dashboard')
+@require_role('Admin', redirect_to='admin_login')
 def admin_dashboard():
-    if 'loggedin' in session and session.get('role') == 'Admin':
-        return render_template('ADC.html')  # Admin Dashboard
-    #else:
-     #   flash("Unauthorized access!", "danger")
-    #    return redirect(url_for('admin_login')) 
+    return render_template('ADC.html')  # Admin Dashboard
 
 @app.route('/admin-AT')
+@require_role('Admin', redirect_to='admin_login')
 def admin_at():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        flash("Unauthorized access!", "danger")
-        return redirect(url_for('admin_login'))
     return render_template('AdminAT.html')  # Admin interface to add questions
 
 @app.route('/add_question', methods=['POST'])
+@require_role('Admin')
 def admin_add_question():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({"success": False, "error": "Unauthorized"}), 403
-
+    conn = None
+    cursor = None
     try:
         # Handle form data (not JSON)
-        qn_text = request.form.get('question', '').strip()
-        options = {
-            'A': request.form.get('optionA', '').strip(),
-            'B': request.form.get('optionB', '').strip(),
-            'C': request.form.get('optionC', '').strip(),
-            'D': request.form.get('optionD', '').strip()
-        }
-        corr_opt = request.form.get('correctOption', '').strip().upper()
-
-        # Validation
-        if not qn_text:
-            return jsonify({"success": False, "error": "Question text is required"}), 400
-        if not all(options.values()):
-            return jsonify({"success": False, "error": "All options are required"}), 400
-        if corr_opt not in ['A', 'B', 'C', 'D']:
-            return jsonify({"success": False, "error": "Correct option must be A, B, C, or D"}), 400
+        row, error = question_record(request.form)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
 
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -768,9 +2904,12 @@ def admin_add_question():
             """INSERT INTO aptitude_test 
             (qn_text, options, corr_opt) 
             VALUES (%s, %s, %s)""",
-            (qn_text, json.dumps(options), corr_opt)
+            row
         )
         conn.commit()
+        question_stats.add(cursor.lastrowid)
+        bump_content_version('questions')
+        answer_key_cache.invalidate(cursor.lastrowid)
         
         return jsonify({
             "success": True,
@@ -788,27 +2927,73 @@ def admin_add_question():
         if conn and conn.is_connected():
             conn.close()
 
+# Sort keys for the admin question list, as (column, direction) pairs
+QUESTION_SORTS = {
+    'newest': (("test_date", "DESC"), ("qn_id", "DESC")),
+    'oldest': (("test_date", "ASC"), ("qn_id", "ASC")),
+    'id': (("qn_id", "ASC"),),
+    'relevance': (("relevance", "DESC"), ("qn_id", "DESC")),
+}
+
+def question_json(qn_id, qn_text, options, corr_opt, test_date):
+    """Encode one aptitude_test row, copying the stored options JSON as-is"""
+    if isinstance(options, bytes):
+        options = options.decode('utf-8')
+    return (f'{{"qn_id": {qn_id}, "qn_text": {json.dumps(qn_text)}, "options": {options}, '
+            f'"corr_opt": {json.dumps(corr_opt)}, "test_date": {json.dumps(test_date)}}}')
+
 @app.route('/get_questions', methods=['GET'])
+@require_role('Admin')
+@cached_response('questions', cache_control='private, no-cache')
 def admin_get_questions():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({"error": "Unauthorized"}), 403
-
+    """One page of the question bank.
+
+    Query args: page, per_page (max 100), search, and sort
+    (newest, oldest, id or relevance).
+    """
+    search_query = request.args.get('search', '').strip()
+    sort_order = request.args.get('sort', 'relevance' if search_query else 'newest')
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
+    terms = search_terms(search_query)
+    fulltext_terms = [term for term in terms if len(term) >= FULLTEXT_MIN_TOKEN]
+    where, where_params = "", []
+    relevance, relevance_params = "0", []
+    if fulltext_terms:
+        boolean_query = " ".join(f"+{term}*" for term in fulltext_terms)
+        where, where_params = " WHERE MATCH(qn_text) AGAINST (%s IN BOOLEAN MODE)", [boolean_query]
+        relevance, relevance_params = "MATCH(qn_text) AGAINST (%s IN BOOLEAN MODE)", [boolean_query]
+    elif terms:
+        # Words too short for the full-text index fall back to a substring scan
+        where, where_params = " WHERE qn_text LIKE %s", [f"%{search_query}%"]
+    sort = QUESTION_SORTS.get(sort_order, QUESTION_SORTS['newest'])
+    if sort_order == 'relevance' and not fulltext_terms:
+        sort = QUESTION_SORTS['newest']
+
+    conn = None
+    cursor = None
     try:
         conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT qn_id, qn_text, options, corr_opt, 
-                   DATE_FORMAT(test_date, '%Y-%m-%d %H:%i:%s') AS test_date 
-            FROM aptitude_test 
-            ORDER BY test_date DESC
-        """)
-        questions = cursor.fetchall()
-        
-        # Convert JSON options to dict
-        for q in questions:
-            q['options'] = json.loads(q['options'])
-        
-        return jsonify(questions)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM aptitude_test" + where, where_params)
+        total = cursor.fetchone()[0]
+
+        # Page through the narrow (test_date, qn_id) index first and only then
+        # read the wide rows for the page, so deep pages stay cheap
+        cursor.execute(f"""
+            SELECT t.qn_id, t.qn_text, t.options, t.corr_opt,
+                   DATE_FORMAT(t.test_date, '%Y-%m-%d %H:%i:%s')
+            FROM (
+                SELECT qn_id, test_date, {relevance} AS relevance
+                FROM aptitude_test{where}
+                ORDER BY {", ".join(f"{column} {direction}" for column, direction in sort)}
+                LIMIT %s OFFSET %s
+            ) p
+            JOIN aptitude_test t ON t.qn_id = p.qn_id
+            ORDER BY {", ".join(f"p.{column} {direction}" for column, direction in sort)}
+        """, relevance_params + where_params + [per_page, (page - 1) * per_page])
+        rows = cursor.fetchall()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     finally:
@@ -817,11 +3002,21 @@ def admin_get_questions():
         if conn and conn.is_connected():
             conn.close()
 
+    # A page is at most 100 rows and cached_response buffers the body anyway,
+    # so it is built in one go rather than streamed
+    return jsonify({
+        "items": [{"qn_id": qn_id, "qn_text": qn_text, "options": json.loads(options),
+                   "corr_opt": corr_opt, "test_date": test_date}
+                  for qn_id, qn_text, options, corr_opt, test_date in rows],
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "has_more": page * per_page < total,
+    })
+
 @app.route('/delete_question', methods=['POST'])
+@require_role('Admin')
 def admin_delete_question():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({"error": "Unauthorized"}), 403
-
     try:
         qn_id = request.form.get('qn_id')
         if not qn_id:
@@ -831,10 +3026,15 @@ def admin_delete_question():
         cursor = conn.cursor()
         
         # Delete responses first to maintain referential integrity
+        retract_progress(cursor, 'aptitude', "qn_id = %s", (qn_id,))
         cursor.execute("DELETE FROM responses WHERE qn_id = %s", (qn_id,))
         # Then delete the question
         cursor.execute("DELETE FROM aptitude_test WHERE qn_id = %s", (qn_id,))
         conn.commit()
+        if str(qn_id).isdigit():
+            question_stats.remove(int(qn_id))
+            answer_key_cache.invalidate(int(qn_id))
+        bump_content_version('questions')
         
         return jsonify({
             "success": True,
@@ -850,14 +3050,207 @@ def admin_delete_question():
         if conn and conn.is_connected():
             conn.close()
 
+QUESTION_OPTION_KEYS = ('A', 'B', 'C', 'D')
+QUESTION_IMPORT_CHUNK = int(os.getenv('QUESTION_IMPORT_CHUNK', 500))
+QUESTION_EXPORT_CHUNK = int(os.getenv('QUESTION_EXPORT_CHUNK', 1000))
+QUESTION_IMPORT_MAX_ERRORS = 1000
+QUESTION_CSV_COLUMNS = ['qn_id', 'question', 'optionA', 'optionB', 'optionC', 'optionD', 'correctOption', 'test_date']
+
+def form_text(value):
+    return '' if value is None else str(value).strip()
+
+def question_record(fields):
+    """Validate one question from the admin form or an import row; returns (row, error)"""
+    qn_text = form_text(fields.get('question'))
+    options = {key: form_text(fields.get(f'option{key}')) for key in QUESTION_OPTION_KEYS}
+    corr_opt = form_text(fields.get('correctOption')).upper()
+
+    if not qn_text:
+        return None, "Question text is required"
+    if not all(options.values()):
+        return None, "All options are required"
+    if corr_opt not in QUESTION_OPTION_KEYS:
+        return None, "Correct option must be A, B, C, or D"
+    return (qn_text, json.dumps(options), corr_opt), None
+
+def parse_json_line(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+def question_import_rows(upload, fmt):
+    """Yield (row number, fields, error) from an uploaded CSV, JSON Lines or JSON file.
+
+    CSV and JSON Lines are read a line at a time. Objects may use the form
+    field names or the export's qn_text/options/corr_opt shape; entries that
+    cannot be read as either come through with fields None and an error.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''))
+        for number, row in enumerate(reader, start=2):
+            yield number, row, None
+        return
+
+    if fmt == 'jsonl':
+        items = ((number, line) for number, line
+                 in enumerate(io.TextIOWrapper(upload.stream, encoding='utf-8'), start=1) if line.strip())
+        items = ((number, parse_json_line(line)) for number, line in items)
+    else:
+        # A JSON array has to be parsed whole; use JSON Lines for very large banks
+        items = enumerate(json.load(upload.stream), start=1)
+
+    for number, item in items:
+        if not isinstance(item, dict):
+            yield number, None, "Not a JSON object"
+            continue
+        if 'qn_text' in item:
+            options = item.get('options') or {}
+            if not isinstance(options, dict):
+                yield number, None, "options must be an object keyed by option letter"
+                continue
+            item = {'question': item['qn_text'], 'correctOption': item.get('corr_opt'),
+                    **{f'option{key}': options.get(key) for key in QUESTION_OPTION_KEYS}}
+        yield number, item, None
+
+@app.route('/admin/questions/import', methods=['POST'])
+@require_role('Admin')
+def admin_import_questions():
+    """Bulk-add questions from an uploaded file (form field `file`).
+
+    Rows are validated like /add_question and inserted QUESTION_IMPORT_CHUNK
+    at a time, one transaction per chunk. Invalid rows are skipped and
+    reported by row number.
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({"success": False, "error": "Upload a CSV, JSON or JSON Lines file as 'file'"}), 400
+    fmt = request.form.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+    fmt = {'ndjson': 'jsonl'}.get(fmt, fmt)
+    if fmt not in ('csv', 'json', 'jsonl'):
+        return jsonify({"success": False, "error": f"Unsupported format: {fmt}"}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    imported = failed = 0
+    errors = []
+    chunk = []
+
+    def flush():
+        cursor.executemany("INSERT INTO aptitude_test (qn_text, options, corr_opt) VALUES (%s, %s, %s)", chunk)
+        conn.commit()
+        chunk.clear()
+
+    try:
+        for number, fields, error in question_import_rows(upload, fmt):
+            if error is None:
+                row, error = question_record(fields)
+            if error:
+                failed += 1
+                if len(errors) < QUESTION_IMPORT_MAX_ERRORS:
+                    errors.append({"row": number, "error": error})
+                continue
+            chunk.append(row)
+            imported += 1
+            if len(chunk) >= QUESTION_IMPORT_CHUNK:
+                flush()
+        if chunk:
+            flush()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        # Malformed file: earlier chunks stay committed, the rest is dropped
+        conn.rollback()
+        imported -= len(chunk)
+        errors.append({"row": None, "error": f"Could not read file: {e}"})
+    except mysql.connector.Error as e:
+        conn.rollback()
+        imported -= len(chunk)
+        errors.append({"row": None, "error": f"MySQL Error: {e}"})
+    finally:
+        if imported:
+            question_stats.expire()
+            bump_content_version('questions')
+        cursor.close()
+        conn.close()
+
+    return jsonify({
+        "success": not errors,
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+    })
+
+def question_export_chunks(fmt):
+    """Walk aptitude_test by qn_id in chunks and yield the encoded file"""
+    conn = PooledConnection(db_pool, db_pool.checkout())
+    cursor = conn.cursor()
+    try:
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(QUESTION_CSV_COLUMNS)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        elif fmt == 'json':
+            yield '['
+
+        last_id, first = 0, True
+        while True:
+            cursor.execute("""
+                SELECT qn_id, qn_text, options, corr_opt,
+                       DATE_FORMAT(test_date, '%Y-%m-%d %H:%i:%s')
+                FROM aptitude_test
+                WHERE qn_id > %s
+                ORDER BY qn_id
+                LIMIT %s
+            """, (last_id, QUESTION_EXPORT_CHUNK))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            if fmt == 'csv':
+                for qn_id, qn_text, options, corr_opt, test_date in rows:
+                    options = json.loads(options)
+                    writer.writerow([qn_id, qn_text, *(options.get(key, '') for key in QUESTION_OPTION_KEYS),
+                                     corr_opt, test_date])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                lines = [question_json(*row) for row in rows]
+                if fmt == 'jsonl':
+                    yield "\n".join(lines) + "\n"
+                else:
+                    yield ("" if first else ",") + "\n" + ",\n".join(lines)
+            first = False
+
+        if fmt == 'json':
+            yield '\n]\n'
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/admin/questions/export')
+@require_role('Admin')
+def admin_export_questions():
+    """Stream the whole question bank as CSV, JSON Lines or a JSON array"""
+    fmt = request.args.get('format', 'csv').lower()
+    mimetypes = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson', 'json': 'application/json'}
+    if fmt not in mimetypes:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    response = app.response_class(question_export_chunks(fmt), mimetype=mimetypes[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=aptitude_questions.{fmt}'
+    return response
+
 # ----- Student Side -----
 
 
 @app.route('/submit_answer', methods=['POST'])
+@require_role('Student')
 def submit_answer():
-    if 'loggedin' not in session or session.get('role') != 'Student':
-        return jsonify({"success": False, "error": "Unauthorized"}), 403
-
+    conn = None
+    cursor = None
     try:
         qn_id = request.form.get('qn_id')
         selected_option = request.form.get('selected_option', '').upper()
@@ -865,16 +3258,15 @@ def submit_answer():
 
         if not qn_id or not selected_option:
             return jsonify({"success": False, "error": "Missing question ID or selected option"}), 400
+        if not qn_id.isdigit():
+            return jsonify({"success": False, "error": "Invalid question ID"}), 400
+        qn_id = int(qn_id)
 
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
-        # Get correct answer
-        cursor.execute(
-            "SELECT corr_opt FROM aptitude_test WHERE qn_id = %s", 
-            (qn_id,)
-        )
-        question = cursor.fetchone()
+        # Get correct answer (served from the answer-key cache when possible)
+        question = answer_key_cache.get_many(cursor, [qn_id]).get(qn_id)
         
         if not question:
             return jsonify({"success": False, "error": "Invalid question ID"}), 400
@@ -889,13 +3281,103 @@ def submit_answer():
             VALUES (%s, %s, %s, %s)""",
             (user_id, qn_id, selected_option, score)
         )
+        record_progress(cursor, user_id, None, 'aptitude', score)
         conn.commit()
+        leaderboards.record(user_id, 'aptitude', score)
         
         return jsonify({
             "success": True,
             "is_correct": is_correct,  
             "correct_option": question['corr_opt'],
-            "score": score
+            "score": score,
+            **record_test_answer(cursor, qn_id, user_id, is_correct)
+        })
+
+    except Exception as e:
+        if conn and conn.is_connected():
+            conn.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+
+@app.route('/submit_answers', methods=['POST'])
+@require_role('Student')
+def submit_answers():
+    """Grade a whole answer sheet with one lookup and one multi-row insert.
+
+    Expects JSON: {"answers": [{"qn_id": 1, "selected_option": "A"}, ...]}
+    and returns one result per answer in the same shape as /submit_answer.
+    """
+    conn = None
+    cursor = None
+    try:
+        data = request.get_json(silent=True) or {}
+        answers = data.get('answers')
+        user_id = session['id']
+
+        if not isinstance(answers, list) or not answers:
+            return jsonify({"success": False, "error": "No answers submitted"}), 400
+
+        sheet = []
+        for answer in answers:
+            qn_id = str(answer.get('qn_id', '')).strip() if isinstance(answer, dict) else ''
+            selected_option = str(answer.get('selected_option', '')).upper() if isinstance(answer, dict) else ''
+            if not qn_id.isdigit() or not selected_option:
+                return jsonify({"success": False, "error": "Missing question ID or selected option"}), 400
+            sheet.append((int(qn_id), selected_option))
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        # Get all correct answers from the cache, with one query for any misses
+        qn_ids = list({qn_id for qn_id, _ in sheet})
+        answer_key = {
+            qn_id: entry['corr_opt']
+            for qn_id, entry in answer_key_cache.get_many(cursor, qn_ids).items()
+        }
+
+        results = []
+        rows = []
+        for qn_id, selected_option in sheet:
+            corr_opt = answer_key.get(qn_id)
+            if corr_opt is None:
+                results.append({"qn_id": qn_id, "success": False, "error": "Invalid question ID"})
+                continue
+            is_correct = (selected_option == corr_opt)
+            score = 1 if is_correct else 0
+            rows.append((user_id, qn_id, selected_option, score))
+            results.append({
+                "qn_id": qn_id,
+                "success": True,
+                "is_correct": is_correct,
+                "correct_option": corr_opt,
+                "score": score
+            })
+
+        # Record all responses in one round trip
+        if rows:
+            cursor.executemany(
+                """INSERT INTO responses 
+                (UserID, qn_id, selected_option, score) 
+                VALUES (%s, %s, %s, %s)""",
+                rows
+            )
+            record_progress(cursor, user_id, None, 'aptitude',
+                            sum(row[3] for row in rows), len(rows))
+            conn.commit()
+            leaderboards.record(user_id, 'aptitude', sum(row[3] for row in rows), len(rows))
+            ability = question_stats.ability(user_id)
+            for _, qn_id, _, score in rows:
+                question_stats.record(qn_id, user_id, score, ability)
+
+        return jsonify({
+            "success": True,
+            "results": results,
+            "total_score": sum(r.get("score", 0) for r in results)
         })
 
     except Exception as e:
@@ -914,10 +3396,9 @@ def admin_cc():
     return render_template('AdminCC.html')
 
 @app.route('/api/coding-challenges', methods=['GET'])
+@require_role()
+@cached_response('challenges', cache_control=f'private, max-age={RESPONSE_MAX_AGE}')
 def get_challenges():
-    if 'loggedin' not in session:
-        return jsonify({"error": "Unauthorized"}), 403
-        
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
@@ -937,10 +3418,8 @@ def get_challenges():
         conn.close()
 
 @app.route('/api/coding-challenges', methods=['POST'])
+@require_role('Admin')
 def add_challenge():
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({"error": "Unauthorized"}), 403
-        
     try:
         title = request.form.get('title')
         description = request.form.get('description')
@@ -963,6 +3442,7 @@ def add_challenge():
         
         conn.commit()
         challenge_id = cursor.lastrowid
+        bump_content_version('challenges')
         
         return jsonify({
             "success": True,
@@ -976,20 +3456,27 @@ def add_challenge():
         conn.close()
 
 @app.route('/api/coding-challenges/<int:challenge_id>', methods=['DELETE'])
+@require_role('Admin')
 def delete_challenge(challenge_id):
-    if 'loggedin' not in session or session.get('role') != 'Admin':
-        return jsonify({"error": "Unauthorized"}), 403
-        
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
         # Delete related submissions first (to maintain referential integrity)
+        cursor.execute("""
+            DELETE r FROM coding_submission_results r
+            JOIN coding_submissions s ON r.submission_id = s.id
+            WHERE s.challenge_id = %s
+        """, (challenge_id,))
+        retract_progress(cursor, 'codingChallenge', "challenge_id = %s", (challenge_id,))
         cursor.execute("DELETE FROM coding_submissions WHERE challenge_id = %s", (challenge_id,))
+        cursor.execute("DELETE FROM challenge_test_cases WHERE challenge_id = %s", (challenge_id,))
         
         # Then delete the challenge
         cursor.execute("DELETE FROM coding_challenges WHERE id = %s", (challenge_id,))
         conn.commit()
+        bump_content_version('challenges')
+        code_result_cache.invalidate(predicate=lambda key: key[0] == challenge_id)
         
         return jsonify({
             "success": True,
@@ -1002,16 +3489,94 @@ def delete_challenge(challenge_id):
         cursor.close()
         conn.close()
 
+@app.route('/api/coding-challenges/<int:challenge_id>/test-cases', methods=['GET'])
+@require_role('Admin')
+def get_test_cases(challenge_id):
+    conn = None
+    cursor = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, position, stdin, expected_output, is_hidden
+            FROM challenge_test_cases
+            WHERE challenge_id = %s
+            ORDER BY position, id
+        """, (challenge_id,))
+        return jsonify({"test_cases": cursor.fetchall()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+@app.route('/api/coding-challenges/<int:challenge_id>/test-cases', methods=['POST'])
+@require_role('Admin')
+def add_test_cases(challenge_id):
+    """Append test cases: JSON {"test_cases": [{"input", "expected_output", "hidden"}]}"""
+    data = request.get_json(silent=True) or {}
+    cases = data.get('test_cases')
+    if not isinstance(cases, list) or not cases:
+        return jsonify({"error": "At least one test case is required"}), 400
+    if any(not isinstance(case, dict) or case.get('expected_output') is None for case in cases):
+        return jsonify({"error": "Every test case needs an expected_output"}), 400
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(position), 0) FROM challenge_test_cases WHERE challenge_id = %s",
+                       (challenge_id,))
+        position = cursor.fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO challenge_test_cases
+            (challenge_id, position, stdin, expected_output, is_hidden)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [
+            (challenge_id, position + index + 1, case.get('input', ''),
+             case['expected_output'], bool(case.get('hidden', True)))
+            for index, case in enumerate(cases)
+        ])
+        conn.commit()
+        code_result_cache.invalidate(predicate=lambda key: key[0] == challenge_id)
+        return jsonify({"success": True, "added": len(cases)})
+    except Exception as e:
+        if conn: conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+@app.route('/api/coding-challenges/<int:challenge_id>/test-cases/<int:case_id>', methods=['DELETE'])
+@require_role('Admin')
+def delete_test_case(challenge_id, case_id):
+    conn = None
+    cursor = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM challenge_test_cases WHERE id = %s AND challenge_id = %s",
+                       (case_id, challenge_id))
+        conn.commit()
+        code_result_cache.invalidate(predicate=lambda key: key[0] == challenge_id)
+        return jsonify({"success": True})
+    except Exception as e:
+        if conn: conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
 @app.route('/get_challenges')
 def get_challenges_alias():
     return student_get_challenges()
 
 # Student routes for coding challenges
 @app.route('/get_challenges')
+@require_role('Student')
+@cached_response('challenges', cache_control=f'private, max-age={RESPONSE_MAX_AGE}')
 def student_get_challenges():
-    if 'loggedin' not in session or session.get('role') != 'Student':
-        return jsonify({"error": "Unauthorized"}), 403
-        
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
@@ -1029,22 +3594,41 @@ def student_get_challenges():
         cursor.close()
         conn.close()
 
-# Route to submit code (already exists)
-@app.route('/submit_code', methods=['POST'])
-def submit_code():
-    if 'loggedin' not in session or session.get('role') != 'Student':
-        return jsonify({"error": "Unauthorized"}), 403
-        
+# Judged results keyed on the code and everything it was judged against, so
+# byte-identical resubmissions skip Judge0 entirely
+code_result_cache = TTLCache(
+    max_entries=int(os.getenv('CODE_RESULT_CACHE_SIZE', 2000)),
+    ttl=int(os.getenv('CODE_RESULT_CACHE_TTL', 3600))
+)
+
+# Verdicts that depend on Judge0 availability rather than the code itself
+UNCACHEABLE_VERDICTS = ("Error", "Skipped", "Internal Error", "In Queue", "Processing")
+
+def code_result_key(challenge_id, language_id, code, test_cases, fail_fast):
+    # The challenge version is the content it is judged against, so editing
+    # its expected output or test cases changes every key for it
+    digest = hashlib.sha256()
+    for part in (language_id, code, fail_fast):
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    for case in test_cases:
+        digest.update(repr((case["stdin"], case["expected_output"])).encode())
+        digest.update(b"\0")
+    return (int(challenge_id), digest.hexdigest())
+
+def run_code_submission(user_id, data):
+    """Judge a submission and record it; returns (response_data, http_status)"""
+    conn = None
+    cursor = None
     try:
-        data = request.json
-        user_id = session['id']
         challenge_id = data.get('challenge_id')
         code = data.get('code')
         input_data = data.get('input', '')
         language = data.get('language', 'python')  # Default to Python
+        fail_fast = bool(data.get('fail_fast', False))
         
         if not all([challenge_id, code]):
-            return jsonify({"error": "Missing required fields"}), 400
+            return {"error": "Missing required fields"}, 400
             
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
@@ -1054,29 +3638,56 @@ def submit_code():
         challenge = cursor.fetchone()
         
         if not challenge:
-            return jsonify({"error": "Challenge not found"}), 404
+            return {"error": "Challenge not found"}, 404
         
         expected_output = challenge['expected_output']
         
         # Submit to Judge0
         language_id = LANGUAGE_IDS.get(language.lower())
         if not language_id:
-            return jsonify({"error": f"Unsupported language: {language}"}), 400
+            return {"error": f"Unsupported language: {language}"}, 400
+        
+        cursor.execute("""
+            SELECT id, stdin, expected_output, is_hidden
+            FROM challenge_test_cases
+            WHERE challenge_id = %s
+            ORDER BY position, id
+        """, (challenge_id,))
+        test_cases = cursor.fetchall()
         
-        judge0_result = submit_to_judge0(code, language_id, input_data)
+        legacy = not test_cases
+        if legacy:
+            # Challenges without a test-case table are judged against the
+            # student's own input and the challenge's single expected output
+            test_cases = [{"id": None, "stdin": input_data, "expected_output": expected_output, "is_hidden": False}]
         
-        # Check if output matches expected
-        is_correct = False
-        if judge0_result.get("status_id") == 3:  # If execution was successful
-            user_output = judge0_result.get("stdout", "").strip()
-            expected = expected_output.strip()
-            is_correct = user_output == expected
+        cache_key = code_result_key(challenge_id, language_id, code, test_cases, fail_fast)
+        case_results = code_result_cache.get(cache_key)
+        if case_results is not None:
+            case_results = copy.deepcopy(case_results)
+        else:
+            if legacy:
+                judge0_result = code_runner.run(code, language_id, input_data)
+                verdict, passed = test_case_verdict(judge0_result, expected_output)
+                judge0_result.update({"verdict": verdict, "passed": passed})
+                case_results = [judge0_result]
+            else:
+                case_results = code_runner.run_batch(code, language_id, test_cases, fail_fast=fail_fast)
+            if not any(result["verdict"] in UNCACHEABLE_VERDICTS for result in case_results):
+                code_result_cache.put(cache_key, copy.deepcopy(case_results))
         
-        # Record submission in database
-        status = "Correct" if is_correct else "Incorrect"
-        if judge0_result.get("status_id") != 3:
-            status = judge0_result.get("status", "Error")
-            
+        # The first failing case decides the aggregate status. With fail_fast,
+        # cases still pending when another failed come back "Skipped", so
+        # prefer the first real verdict over a skipped case before it.
+        failing = next((result for result in case_results
+                        if not result["passed"] and result["verdict"] != "Skipped"), None)
+        failing = failing or next((result for result in case_results if not result["passed"]), None)
+        status = failing["verdict"] if failing else "Accepted"
+        is_correct = failing is None
+        shown = failing or case_results[0]
+        
+        # Record submission and its per-case verdicts in the database
+        submitted_at = datetime.datetime.now()
         cursor.execute("""
             INSERT INTO coding_submissions 
             (user_id, challenge_id, submitted_code, input_data, output, expected_output, 
@@ -1084,44 +3695,630 @@ def submit_code():
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             user_id, challenge_id, code, input_data, 
-            judge0_result.get("stdout", ""), expected_output,
-            datetime.datetime.now(), status, language
+            shown.get("stdout", ""), expected_output,
+            submitted_at, status, language
         ))
+        submission_id = cursor.lastrowid
+        record_progress(cursor, user_id, submitted_at.date(), 'codingChallenge', 1 if is_correct else 0)
+        
+        cursor.executemany("""
+            INSERT INTO coding_submission_results
+            (submission_id, test_case_id, status, passed, time, memory)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [
+            (submission_id, case["id"], result["verdict"], result["passed"],
+             result.get("time"), result.get("memory"))
+            for case, result in zip(test_cases, case_results)
+        ])
         
         conn.commit()
+        leaderboards.record(user_id, 'codingChallenge', 1 if is_correct else 0)
         
         # Prepare response
         response_data = {
             "success": True,
-            "status": judge0_result.get("status"),
-            "output": judge0_result.get("stdout", ""),
+            "status": status,
+            "output": shown.get("stdout", ""),
             "is_correct": is_correct,
-            "execution_time": f"{judge0_result.get('time', '0')} seconds",
-            "memory_used": f"{judge0_result.get('memory', '0')} KB"
+            "passed": sum(1 for result in case_results if result["passed"]),
+            "total": len(case_results),
+            "test_cases": [
+                {
+                    "case": index + 1,
+                    "status": result["verdict"],
+                    "passed": result["passed"],
+                    "time": result.get("time"),
+                    "memory": result.get("memory"),
+                    # Never leak the output of hidden cases
+                    **({} if case["is_hidden"] else {"output": result.get("stdout", "")})
+                }
+                for index, (case, result) in enumerate(zip(test_cases, case_results))
+            ],
+            "execution_time": f"{shown.get('time', '0')} seconds",
+            "memory_used": f"{shown.get('memory', '0')} KB"
         }
         
-        if judge0_result.get("stderr"):
-            response_data["error_output"] = judge0_result.get("stderr")
-        if judge0_result.get("compile_output"):
-            response_data["compile_output"] = judge0_result.get("compile_output")
+        if shown.get("error"):
+            response_data["error_output"] = shown.get("error")
+        if shown.get("stderr"):
+            response_data["error_output"] = shown.get("stderr")
+        if shown.get("compile_output"):
+            response_data["compile_output"] = shown.get("compile_output")
             
-        return jsonify(response_data)
+        return response_data, 200
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return {"error": str(e)}, 500
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+# Route to submit code (already exists)
+@app.route('/submit_code', methods=['POST'])
+@require_role('Student')
+def submit_code():
+    response_data, status_code = run_code_submission(session['id'], request.json or {})
+    return jsonify(response_data), status_code
+
+
+# ----- Background code execution -----
+# Long Judge0 runs are handed to a worker pool so request threads return
+# straight away; CC.html polls the job until it is done. The poll can reach
+# any worker, so with CODE_JOB_BACKEND=sql (the default) jobs are kept in the
+# `code_jobs` table; memory keeps them in this process and only works when
+# the app runs as a single process. Jobs expire CODE_JOB_TTL seconds after
+# their last change, including ones a crashed worker left queued or running.
+
+CODE_JOB_BACKEND = os.getenv('CODE_JOB_BACKEND', 'sql').lower()
+CODE_JOB_TTL = int(os.getenv('CODE_JOB_TTL', 600))
+code_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CODE_EXECUTION_WORKERS', 4)),
+    thread_name_prefix='code-job'
+)
+
+class MemoryCodeJobStore:
+    """Jobs in a dict; for single-process deployments"""
+
+    name = "memory"
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id, user_id):
+        with self._lock:
+            self._jobs[job_id] = {'state': 'queued', 'user_id': user_id, 'updated_at': time.monotonic()}
+
+    def update(self, job_id, state, result=None, http_status=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update({'state': state, 'result': result, 'http_status': http_status,
+                            'updated_at': time.monotonic()})
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def prune(self):
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job['updated_at'] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+class SQLCodeJobStore:
+    """Jobs in the `code_jobs` table, visible to every worker and node"""
+
+    name = "sql"
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def _run(self, query, params, fetch=False):
+        # Own connection, so job bookkeeping never commits a view's work
+        conn = PooledConnection(db_pool, db_pool.checkout())
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            if fetch:
+                return cursor.fetchone()
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def create(self, job_id, user_id):
+        self._run("INSERT INTO code_jobs (id, user_id, state, updated_at) VALUES (%s, %s, 'queued', NOW())",
+                  (job_id, user_id))
+
+    def update(self, job_id, state, result=None, http_status=None):
+        self._run("""
+            UPDATE code_jobs SET state = %s, result = %s, http_status = %s, updated_at = NOW()
+            WHERE id = %s
+        """, (state, None if result is None else app.json.dumps(result), http_status, job_id))
+
+    def get(self, job_id):
+        row = self._run("SELECT state, user_id, result, http_status FROM code_jobs WHERE id = %s",
+                        (job_id,), fetch=True)
+        if not row:
+            return None
+        state, user_id, result, http_status = row
+        return {'state': state, 'user_id': user_id,
+                'result': None if result is None else json.loads(result), 'http_status': http_status}
+
+    def prune(self):
+        self._run("DELETE FROM code_jobs WHERE updated_at < NOW() - INTERVAL %s SECOND LIMIT 1000",
+                  (self.ttl,))
+
+
+def make_code_job_store(backend):
+    if backend == 'memory':
+        return MemoryCodeJobStore(ttl=CODE_JOB_TTL)
+    return SQLCodeJobStore(ttl=CODE_JOB_TTL)
+
+code_jobs = make_code_job_store(CODE_JOB_BACKEND)
+
+def run_code_job(job_id, user_id, data):
+    try:
+        code_jobs.update(job_id, 'running')
+        with app.app_context():
+            result, status_code = run_code_submission(user_id, data)
+    except Exception as e:
+        result, status_code = {"error": str(e)}, 500
+    try:
+        code_jobs.update(job_id, 'done', result, status_code)
+    except Exception as e:
+        print(f"Code job {job_id} could not be saved: {e}")
+
+@app.route('/api/code-submissions', methods=['POST'])
+@require_role('Student')
+def enqueue_code_submission():
+    data = request.json or {}
+    if not all([data.get('challenge_id'), data.get('code')]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    job_id = uuid.uuid4().hex
+    try:
+        code_jobs.prune()
+        code_jobs.create(job_id, session['id'])
+    except Exception as e:
+        return jsonify({"error": "Failed to queue submission", "details": str(e)}), 500
+    code_executor.submit(run_code_job, job_id, session['id'], data)
+
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "state": "queued",
+        "poll_url": url_for('get_code_submission', job_id=job_id)
+    }), 202
+
+@app.route('/api/code-submissions/<job_id>', methods=['GET'])
+@require_role('Student')
+def get_code_submission(job_id):
+    try:
+        job = code_jobs.get(job_id)
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch job", "details": str(e)}), 500
+
+    if not job or job['user_id'] != session['id']:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job['state'] != 'done':
+        return jsonify({"job_id": job_id, "state": job['state']})
+
+    return jsonify({
+        "job_id": job_id,
+        "state": "done",
+        "http_status": job['http_status'],
+        "result": job['result']
+    })
+
+# ----- Admin analytics -----
+# Cohort reports for AdminPD.html are computed from a periodic columnar
+# snapshot of responses, coding_submissions and mock_interviews rather than
+# with ad-hoc SQL against the live tables. Each table becomes a few NumPy
+# columns; text columns are dictionary-encoded and student ids are replaced
+# by their row in the Student snapshot, so every report is a handful of
+# vectorized bincounts. With ANALYTICS_SNAPSHOT_DIR set, snapshots are saved
+# as .npy files and memory-mapped, so worker processes share one copy in the
+# page cache. `flask analytics-snapshot`, run from cron, is then the only
+# writer; web workers just pick up the latest snapshot it saved.
+
+ANALYTICS_SNAPSHOT_DIR = os.getenv('ANALYTICS_SNAPSHOT_DIR', '')
+ANALYTICS_TTL = int(os.getenv('ANALYTICS_TTL', 900))
+ANALYTICS_FETCH_SIZE = int(os.getenv('ANALYTICS_FETCH_SIZE', 50000))
+ANALYTICS_PASS_MARK = float(os.getenv('ANALYTICS_PASS_MARK', 0.6))
+
+# table -> (query, [(column, dtype)]); dtype str means dictionary-encoded text.
+# Days are counted from 1970-01-01 so date filters are integer comparisons.
+ANALYTICS_TABLES = {
+    "students": (
+        "SELECT UserID, COALESCE(CAST(batch_year AS CHAR), 'Unknown') FROM Student ORDER BY UserID",
+        [("user_id", np.int64), ("batch", str)],
+    ),
+    "responses": (
+        "SELECT UserID, COALESCE(score, 0), COALESCE(DATEDIFF(response_date, '1970-01-01'), 0) "
+        "FROM responses",
+        [("user_id", np.int64), ("correct", np.int8), ("day", np.int32)],
+    ),
+    "submissions": (
+        "SELECT user_id, COALESCE(language, 'unknown'), status = 'Accepted', "
+        "COALESCE(DATEDIFF(submission_time, '1970-01-01'), 0) FROM coding_submissions",
+        [("user_id", np.int64), ("language", str), ("accepted", np.int8), ("day", np.int32)],
+    ),
+    "interviews": (
+        "SELECT user_id, rating, COALESCE(DATEDIFF(interview_date, '1970-01-01'), 0) "
+        "FROM mock_interviews WHERE rating IS NOT NULL AND user_id IS NOT NULL",
+        [("user_id", np.int64), ("rating", np.int8), ("day", np.int32)],
+    ),
+}
+
+def fetch_columns(cursor, query, columns):
+    """Stream a query into NumPy columns; returns (arrays, dictionaries)"""
+    cursor.execute(query)
+    chunks = {name: [] for name, _ in columns}
+    codes = {name: {} for name, dtype in columns if dtype is str}
+    while True:
+        rows = cursor.fetchmany(ANALYTICS_FETCH_SIZE)
+        if not rows:
+            break
+        for (name, dtype), values in zip(columns, zip(*rows)):
+            if dtype is str:
+                index = codes[name]
+                values = [index.setdefault(value, len(index)) for value in values]
+                dtype = np.int32
+            chunks[name].append(np.array(values, dtype=dtype))
+    arrays = {}
+    for name, dtype in columns:
+        dtype = np.int32 if dtype is str else dtype
+        arrays[name] = np.concatenate(chunks[name]) if chunks[name] else np.zeros(0, dtype=dtype)
+    return arrays, {name: list(index) for name, index in codes.items()}
+
+def build_analytics_snapshot(conn):
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    columns, dictionaries = {}, {}
+    try:
+        for table, (query, spec) in ANALYTICS_TABLES.items():
+            arrays, codes = fetch_columns(cursor, query, spec)
+            columns.update({f"{table}.{name}": array for name, array in arrays.items()})
+            dictionaries.update({f"{table}.{name}": values for name, values in codes.items()})
     finally:
         cursor.close()
-        conn.close()
+
+    # Replace user ids with their row in the Student snapshot. Rows of users
+    # who are not students point one past the end, so reports can bincount
+    # them into a spare slot instead of filtering them out. Kept as int64,
+    # which bincount uses natively.
+    student_ids = columns["students.user_id"]
+    for table in ("responses", "submissions", "interviews"):
+        user_ids = columns.pop(f"{table}.user_id")
+        row = np.searchsorted(student_ids, user_ids)
+        found = row < len(student_ids)
+        found[found] = student_ids[row[found]] == user_ids[found]
+        row[~found] = len(student_ids)
+        columns[f"{table}.student"] = row.astype(np.int64)
+
+    return {
+        "columns": columns,
+        "dictionaries": dictionaries,
+        "built_at": time.time(),
+        "build_seconds": round(time.perf_counter() - started, 3),
+    }
+
+def save_analytics_snapshot(snapshot, directory):
+    """Write a snapshot as .npy files and point current.json at it atomically.
+
+    Older snapshots are removed, so only one process may write to `directory`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"snapshot-{int(snapshot['built_at'] * 1000)}"
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+    for column, array in snapshot["columns"].items():
+        np.save(os.path.join(path, f"{column}.npy"), array)
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump({key: snapshot[key] for key in ("dictionaries", "built_at", "build_seconds")}
+                  | {"columns": sorted(snapshot["columns"])}, f)
+    pointer = os.path.join(directory, "current.json.tmp")
+    with open(pointer, "w") as f:
+        json.dump({"path": name}, f)
+    os.replace(pointer, os.path.join(directory, "current.json"))
+    # Processes still mapping an older snapshot keep reading it after unlink
+    for entry in os.listdir(directory):
+        if entry.startswith("snapshot-") and entry != name:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+def load_analytics_snapshot(directory):
+    with open(os.path.join(directory, "current.json")) as f:
+        path = os.path.join(directory, json.load(f)["path"])
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    manifest["columns"] = {
+        column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+        for column in manifest["columns"]
+    }
+    return manifest
+
+
+class Analytics:
+    """Holds the current snapshot.
+
+    Without a directory the snapshot lives in memory and is rebuilt every
+    `ttl` seconds: the first request waits for the first build, after that a
+    stale snapshot keeps serving while a background thread replaces it, and
+    only one build runs at a time. With a directory the web workers never
+    build; they load whatever `flask analytics-snapshot` last saved there.
+    Report results are cached per snapshot.
+    """
+
+    def __init__(self, directory=ANALYTICS_SNAPSHOT_DIR, ttl=ANALYTICS_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rebuilt = threading.Condition(self._lock)
+        self._snapshot = None
+        self._pointer_mtime = None
+        self._rebuilding = False
+        self.results = TTLCache(max_entries=256, ttl=ttl or 3600)
+
+    def _load_from_disk(self):
+        try:
+            mtime = os.stat(os.path.join(self.directory, "current.json")).st_mtime
+            if mtime == self._pointer_mtime:
+                return
+            snapshot = load_analytics_snapshot(self.directory)
+        except FileNotFoundError:
+            # Nothing saved yet, or replaced while we read it; keep the current one
+            return
+        with self._lock:
+            self._snapshot, self._pointer_mtime = snapshot, mtime
+
+    def _start_rebuild(self):
+        """Start a background build unless one is running; caller holds _lock"""
+        if not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, name='analytics-snapshot',
+                             daemon=True).start()
+
+    def _rebuild_in_background(self):
+        snapshot = None
+        try:
+            conn = get_db_connection()
+            try:
+                snapshot = build_analytics_snapshot(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Analytics snapshot failed: {e}")
+        finally:
+            with self._lock:
+                if snapshot is not None:
+                    self._snapshot = snapshot
+                self._rebuilding = False
+                self._rebuilt.notify_all()
+
+    def rebuild(self):
+        """Rebuild now (joining a build already running), or reread the directory"""
+        if self.directory:
+            self._load_from_disk()
+            return
+        with self._lock:
+            self._start_rebuild()
+            self._rebuilt.wait_for(lambda: not self._rebuilding)
+
+    def current(self):
+        if self.directory:
+            self._load_from_disk()
+        with self._lock:
+            if self._snapshot is None and not self.directory:
+                self._start_rebuild()
+                self._rebuilt.wait_for(lambda: not self._rebuilding)
+            snapshot = self._snapshot
+            if snapshot is None:
+                raise LookupError("No analytics snapshot yet; run flask analytics-snapshot"
+                                  if self.directory else "Analytics snapshot failed to build")
+            if (not self.directory and self.ttl
+                    and time.time() - snapshot["built_at"] > self.ttl):
+                self._start_rebuild()
+        return snapshot
+
+    def report(self, name, since=None, until=None):
+        snapshot = self.current()
+        key = (snapshot["built_at"], name, since, until)
+        result = self.results.get(key)
+        if result is None:
+            started = time.perf_counter()
+            result = ANALYTICS_REPORTS[name](snapshot, since, until)
+            result["compute_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self.results.put(key, result)
+        return {
+            "report": name,
+            "snapshot": {
+                "built_at": datetime.datetime.fromtimestamp(snapshot["built_at"]).isoformat(timespec='seconds'),
+                "rows": {table: int(len(snapshot["columns"][f"{table}.student"]))
+                         for table in ("responses", "submissions", "interviews")},
+            },
+            "filters": {"since": since, "until": until},
+            **result,
+        }
+
+    def stats(self):
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "loaded": snapshot is not None,
+                "memory_mapped": bool(self.directory),
+                "bytes": int(sum(a.nbytes for a in snapshot["columns"].values())) if snapshot else 0,
+                "built_at": snapshot["built_at"] if snapshot else None,
+                "build_seconds": snapshot["build_seconds"] if snapshot else None,
+                "rebuilding": self._rebuilding,
+                "results": self.results.stats(),
+            }
+
+
+def analytics_rows(snapshot, table, since, until):
+    """Column getter for `table` limited to rows in the [since, until] day range"""
+    columns = snapshot["columns"]
+    mask = None
+    if since is not None or until is not None:
+        day = columns[f"{table}.day"]
+        mask = np.ones(len(day), dtype=bool)
+        if since is not None:
+            mask &= day >= since
+        if until is not None:
+            mask &= day <= until
+    return lambda name: columns[f"{table}.{name}"] if mask is None else columns[f"{table}.{name}"][mask]
+
+def student_batches(snapshot):
+    """Batch code per student row plus one for non-students, and the batch labels"""
+    labels = snapshot["dictionaries"]["students.batch"]
+    if "Unknown" not in labels:
+        labels = labels + ["Unknown"]
+    batch = np.append(snapshot["columns"]["students.batch"], labels.index("Unknown"))
+    return batch, labels
+
+def aptitude_by_batch(snapshot, since, until):
+    column = analytics_rows(snapshot, "responses", since, until)
+    batch, labels = student_batches(snapshot)
+
+    # One pass counts answers and correct answers per student: key = 2*student + correct
+    counts = np.bincount(column("student") * 2 + column("correct"), minlength=2 * len(batch))
+    counts = counts.reshape(-1, 2)[:-1]
+    answered, right = counts.sum(axis=1), counts[:, 1]
+    active = answered > 0
+    cohort = batch[:-1][active]
+    rate = right[active] / answered[active]
+    students = np.bincount(cohort, minlength=len(labels))
+    passed = np.bincount(cohort, weights=rate >= ANALYTICS_PASS_MARK, minlength=len(labels))
+    responses = np.bincount(cohort, weights=answered[active], minlength=len(labels))
+    correct_total = np.bincount(cohort, weights=right[active], minlength=len(labels))
+    items = [{
+        "batch_year": labels[i],
+        "students": int(students[i]),
+        "responses": int(responses[i]),
+        "correct_rate": round(float(correct_total[i] / responses[i]), 4),
+        "pass_rate": round(float(passed[i] / students[i]), 4),
+    } for i in np.flatnonzero(students)]
+    items.sort(key=lambda item: item["batch_year"])
+    return {"pass_mark": ANALYTICS_PASS_MARK, "items": items}
+
+def coding_by_language(snapshot, since, until):
+    column = analytics_rows(snapshot, "submissions", since, until)
+    language, student = column("language"), column("student")
+    labels = snapshot["dictionaries"]["submissions.language"]
+
+    counts = np.bincount(language.astype(np.int64) * 2 + column("accepted"),
+                         minlength=2 * len(labels)).reshape(-1, 2)
+    submissions, accepted = counts.sum(axis=1), counts[:, 1]
+    # Students per language: mark (language, student) cells, then count per row
+    seen = np.zeros((len(labels), len(snapshot["columns"]["students.user_id"]) + 1), dtype=bool)
+    seen[language, student] = True
+    students = seen[:, :-1].sum(axis=1)
+    items = [{
+        "language": labels[i],
+        "submissions": int(submissions[i]),
+        "accepted": int(accepted[i]),
+        "acceptance_rate": round(float(accepted[i] / submissions[i]), 4),
+        "students": int(students[i]),
+    } for i in np.flatnonzero(submissions)]
+    items.sort(key=lambda item: -item["submissions"])
+    return {"items": items}
+
+def interview_ratings_by_batch(snapshot, since, until):
+    column = analytics_rows(snapshot, "interviews", since, until)
+    batch, labels = student_batches(snapshot)
+    rating = column("rating")
+
+    # Ratings of users who are not students fall in the spare slot; drop them
+    # as aptitude_by_batch does
+    student = column("student")
+    valid = (rating >= 1) & (rating <= 5) & (student < len(batch) - 1)
+    cohort = batch[student[valid]].astype(np.int64)
+    counts = np.bincount(cohort * 5 + rating[valid] - 1, minlength=len(labels) * 5).reshape(-1, 5)
+    overall = counts.sum(axis=0)
+
+    def summary(row):
+        total = int(row.sum())
+        return {
+            "interviews": total,
+            "distribution": {str(r): int(row[r - 1]) for r in range(1, 6)},
+            "mean_rating": round(float((row * np.arange(1, 6)).sum() / total), 2) if total else None,
+        }
+
+    items = [{"batch_year": labels[i], **summary(counts[i])} for i in np.flatnonzero(counts.sum(axis=1))]
+    items.sort(key=lambda item: item["batch_year"])
+    return {"overall": summary(overall), "items": items}
+
+ANALYTICS_REPORTS = {
+    "aptitude": aptitude_by_batch,
+    "coding": coding_by_language,
+    "interviews": interview_ratings_by_batch,
+}
+
+analytics = Analytics()
+
+def parse_day(value):
+    """YYYY-MM-DD -> days since 1970-01-01, None if empty; raises ValueError"""
+    if not value:
+        return None
+    return (datetime.date.fromisoformat(value) - datetime.date(1970, 1, 1)).days
 
 @app.route('/admin-ProgressDash')
+@require_role('Admin', redirect_to='admin_login')
 def admin_pd():
     return render_template('AdminPD.html')
 
+@app.route('/admin/analytics/<report>')
+@require_role('Admin')
+def admin_analytics(report):
+    """Cohort report from the analytics snapshot; ?since= and ?until= are YYYY-MM-DD"""
+    if report not in ANALYTICS_REPORTS:
+        return jsonify({"error": f"report must be one of {', '.join(ANALYTICS_REPORTS)}"}), 404
+    try:
+        since = parse_day(request.args.get('since'))
+        until = parse_day(request.args.get('until'))
+    except ValueError:
+        return jsonify({"error": "since and until must be dates in YYYY-MM-DD format"}), 400
+    try:
+        return jsonify(analytics.report(report, since, until))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        print(f"Analytics error: {e}")
+        return jsonify({"error": "Failed to compute report", "details": str(e)}), 500
+
+@app.route('/admin/analytics/refresh', methods=['POST'])
+@require_role('Admin')
+def admin_refresh_analytics():
+    """Rebuild the in-memory snapshot, or pick up the latest one in ANALYTICS_SNAPSHOT_DIR"""
+    analytics.rebuild()
+    return jsonify({"success": True, **analytics.stats()})
+
+@app.cli.command('analytics-snapshot')
+def analytics_snapshot():
+    """Snapshot responses, submissions and interviews into ANALYTICS_SNAPSHOT_DIR."""
+    if not ANALYTICS_SNAPSHOT_DIR:
+        raise click.UsageError("Set ANALYTICS_SNAPSHOT_DIR to the directory the web workers read.")
+    conn = get_db_connection()
+    try:
+        snapshot = build_analytics_snapshot(conn)
+    finally:
+        conn.close()
+    save_analytics_snapshot(snapshot, ANALYTICS_SNAPSHOT_DIR)
+    for table in ("students", "responses", "submissions", "interviews"):
+        rows = len(next(array for column, array in snapshot["columns"].items()
+                        if column.startswith(f"{table}.")))
+        click.echo(f"{table}: {rows} rows")
+    click.echo(f"Built in {snapshot['build_seconds']}s")
+
 @app.route('/student_MI')
+@require_role('Student', redirect_to='home', message="Please login as a student to access this page")
 def student_MI():
-    if 'loggedin' not in session or session['role'] != 'Student':
-        flash('Please login as a student to access this page')
-        return redirect(url_for('home'))
     return render_template('MI.html')
     
 class AlumniFeedbackForm(FlaskForm):
@@ -1138,24 +4335,20 @@ class AlumniFeedbackForm(FlaskForm):
                                     validators=[validators.InputRequired(), validators.Length(min=10)])
 
 @app.route('/alumni_MI', methods=['GET', 'POST'])
+@require_role('Alumni', redirect_to='home', message="Please login as an alumni to access this page")
 def alumni_MI():
-    if 'loggedin' not in session or session['role'] != 'Alumni':
-        flash('Please login as an alumni to access this page', 'danger')
-        return redirect(url_for('home'))
-
     form = AlumniFeedbackForm()
     
     # Get available interview sessions
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
     cursor.execute("""
-        SELECT m.meeting_id, m.interview_type, m.interview_date, u.Name as student_name
+        SELECT m.meeting_id, m.interview_type, m.interview_date, m.user_id
         FROM mock_interviews m
-        JOIN Users u ON m.user_id = u.UserID
-        WHERE m.alumni_id IS NULL OR m.alumni_id = %s
+        WHERE m.user_id IS NOT NULL AND (m.alumni_id IS NULL OR m.alumni_id = %s)
         ORDER BY m.interview_date DESC
     """, (session['id'],))
-    interviews = cursor.fetchall()
+    interviews = attach_user_names(cursor, cursor.fetchall(), {'user_id': 'student_name'})
     cursor.close()
     conn.close()
 
@@ -1172,6 +4365,7 @@ def alumni_MI():
             cursor = conn.cursor()
             
             # Update the mock interview record
+            before = interview_ratings(cursor, form.meeting_id.data)
             cursor.execute("""
                 UPDATE mock_interviews 
                 SET professional_presentation = %s,
@@ -1192,6 +4386,7 @@ def alumni_MI():
                 form.meeting_id.data
             ))
             
+            record_interview_rating_change(cursor, before, interview_ratings(cursor, form.meeting_id.data))
             conn.commit()
             flash('Feedback submitted successfully!', 'success')
             return redirect(url_for('alumni_MI'))
@@ -1207,10 +4402,8 @@ def alumni_MI():
 
 
 @app.route('/api/save_meeting_id', methods=['POST'])
+@require_role('Alumni')
 def save_meeting_id():
-    if 'loggedin' not in session or session['role'] != 'Alumni':
-        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
-    
     try:
         data = request.json
         conn = get_db_connection()
@@ -1233,21 +4426,18 @@ def save_meeting_id():
         if conn: conn.close()
 
 @app.route('/api/get_pending_interviews', methods=['GET'])
+@require_role('Alumni')
 def get_pending_interviews():
-    if 'loggedin' not in session or session['role'] != 'Alumni':
-        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
-    
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
-            SELECT m.meeting_id, m.interview_type, m.interview_date, u.Name as student_name
+            SELECT m.meeting_id, m.interview_type, m.interview_date, m.user_id
             FROM mock_interviews m
-            JOIN Users u ON m.user_id = u.UserID
-            WHERE (m.alumni_id IS NULL OR m.alumni_id = %s) AND m.rating IS NULL
+            WHERE m.user_id IS NOT NULL AND (m.alumni_id IS NULL OR m.alumni_id = %s) AND m.rating IS NULL
             ORDER BY m.interview_date DESC
         """, (session['id'],))
-        interviews = cursor.fetchall()
+        interviews = attach_user_names(cursor, cursor.fetchall(), {'user_id': 'student_name'})
         return jsonify({'status': 'success', 'interviews': interviews})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -1256,15 +4446,14 @@ def get_pending_interviews():
         if conn: conn.close()
 
 @app.route('/api/submit_alumni_rating', methods=['POST'])
+@require_role('Alumni')
 def submit_alumni_rating():
-    if 'loggedin' not in session or session['role'] != 'Alumni':
-        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
-    
     try:
         data = request.json
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        before = interview_ratings(cursor, data['meeting_id'])
         cursor.execute("""
             UPDATE mock_interviews 
             SET professional_presentation = %s,
@@ -1285,6 +4474,7 @@ def submit_alumni_rating():
             data['meeting_id']
         ))
         
+        record_interview_rating_change(cursor, before, interview_ratings(cursor, data['meeting_id']))
         conn.commit()
         return jsonify({'status': 'success', 'message': 'Feedback submitted successfully'})
     except Exception as e:
@@ -1295,10 +4485,8 @@ def submit_alumni_rating():
         if conn: conn.close()
 
 @app.route('/api/get_student_feedback/<meeting_id>', methods=['GET'])
+@require_role('Alumni')
 def get_student_feedback(meeting_id):
-    if 'loggedin' not in session or session['role'] != 'Alumni':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
@@ -1325,21 +4513,18 @@ def get_student_feedback(meeting_id):
 
 
 @app.route('/api/get_student_interviews', methods=['GET'])
+@require_role('Student')
 def get_student_interviews():
-    if 'loggedin' not in session or session['role'] != 'Student':
-        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
-    
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
-            SELECT m.meeting_id, m.interview_type, m.interview_date, u.Name as alumni_name
+            SELECT m.meeting_id, m.interview_type, m.interview_date, m.alumni_id
             FROM mock_interviews m
-            LEFT JOIN Users u ON m.alumni_id = u.UserID
             WHERE m.user_id = %s OR (m.user_id IS NULL AND m.alumni_id IS NOT NULL)
             ORDER BY m.interview_date DESC
         """, (session['id'],))
-        interviews = cursor.fetchall()
+        interviews = attach_user_names(cursor, cursor.fetchall(), {'alumni_id': 'alumni_name'})
         return jsonify({'status': 'success', 'interviews': interviews})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -1348,10 +4533,8 @@ def get_student_interviews():
         if conn: conn.close()
 
 @app.route('/api/get_interview_details/<meeting_id>', methods=['GET'])
+@require_role()
 def get_interview_details(meeting_id):
-    if 'loggedin' not in session:
-        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
-    
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
@@ -1368,16 +4551,15 @@ def get_interview_details(meeting_id):
         if conn: conn.close()
 
 @app.route('/api/submit_interview_feedback', methods=['POST'])
+@require_role('Student')
 def submit_interview_feedback():
-    if 'loggedin' not in session or session['role'] != 'Student':
-        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
-    
     try:
         data = request.json
         conn = get_db_connection()
         cursor = conn.cursor()
         
         # Update the mock interview record with student feedback
+        before = interview_ratings(cursor, data['meeting_id'])
         cursor.execute("""
             UPDATE mock_interviews 
             SET user_id = %s,
@@ -1396,6 +4578,7 @@ def submit_interview_feedback():
             data['meeting_id']
         ))
         
+        record_interview_rating_change(cursor, before, interview_ratings(cursor, data['meeting_id']))
         conn.commit()
         return jsonify({'status': 'success', 'message': 'Feedback submitted'})
     except Exception as e:
@@ -1414,86 +4597,184 @@ def logout():
 
 
 
+# Role-specific row written next to Users: table, id column, required and optional fields
+REGISTRATION_ROLES = {
+    'Student': {"table": "Student", "id_column": "student_id", "required": ("batch_year",), "optional": (),
+                "missing": "Batch year is required for students."},
+    'Alumni': {"table": "Alumni", "id_column": "alumni_id", "required": ("grad_year",),
+               "optional": ("company", "designation", "bio"),
+               "missing": "Graduation year is required for alumni."},
+    'Admin': {"table": "Admin", "id_column": "admin_id", "required": ("position",), "optional": (),
+              "missing": "Position is required for admins."},
+}
+IMPORT_CHUNK_SIZE = 500
+
+def registration_record(fields):
+    """Validate one registration (a form or CSV row); returns (record, error)"""
+    name = (fields.get('name') or '').strip()
+    email = (fields.get('email') or '').strip()
+    password = fields.get('password') or ''
+    role = (fields.get('role') or '').strip()
+    if not all([name, email, password, role]):
+        return None, "All fields are required."
+    config = REGISTRATION_ROLES.get(role)
+    if config is None:
+        return None, f"Unknown role: {role}"
+
+    details = {}
+    for field in config["required"]:
+        details[field] = (fields.get(field) or '').strip()
+        if not details[field]:
+            return None, config["missing"]
+    for field in config["optional"]:
+        details[field] = (fields.get(field) or '').strip()
+    return {"name": name, "email": email, "password": password, "role": role, "details": details}, None
+
+def role_insert_sql(role, user_id_sql="%s"):
+    config = REGISTRATION_ROLES[role]
+    columns = ["UserID", config["id_column"], *config["required"], *config["optional"]]
+    values = [user_id_sql, user_id_sql] + ["%s"] * (len(columns) - 2)
+    return f"INSERT INTO {config['table']} ({', '.join(columns)}) VALUES ({', '.join(values)})"
+
+def insert_registration(cursor, record, password_hash):
+    """Insert the Users row and its role row; the caller commits"""
+    cursor.execute("INSERT INTO Users (Name, Email, Password, Role) VALUES (%s, %s, %s, %s)",
+                   (record["name"], record["email"], password_hash, record["role"]))
+    cursor.execute(role_insert_sql(record["role"], "LAST_INSERT_ID()"), tuple(record["details"].values()))
+
+@app.cli.command('import-users')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--role', type=click.Choice(sorted(REGISTRATION_ROLES)), default='Student',
+              help='Role for rows without a role column.')
+@click.option('--batch-year', help='Batch year for student rows that leave it blank.')
+@click.option('--credentials-out', type=click.File('w'),
+              help='CSV to receive generated passwords for rows without one.')
+def import_users(csv_file, role, batch_year, credentials_out):
+    """Register every user in CSV_FILE in one transaction.
+
+    Columns: name, email, and optionally password, role and the role's fields
+    (batch_year; grad_year, company, designation, bio; position). Emails that
+    are already registered are skipped.
+    """
+    records, errors, generated, seen = [], [], {}, set()
+    for line, row in enumerate(csv.DictReader(csv_file), start=2):
+        row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+        row['role'] = row.get('role') or role
+        if batch_year and not row.get('batch_year'):
+            row['batch_year'] = batch_year
+        if not row.get('password'):
+            row['password'] = generated[row.get('email', '').lower()] = secrets.token_urlsafe(9)
+
+        record, error = registration_record(row)
+        if error is None and record["email"].lower() in seen:
+            error = f"duplicate email {record['email']}"
+        if error:
+            errors.append(f"line {line}: {error}")
+            continue
+        seen.add(record["email"].lower())
+        records.append(record)
+
+    if generated and credentials_out is None:
+        errors.append("some rows have no password; pass --credentials-out to receive the generated ones")
+    if errors:
+        for error in errors:
+            click.echo(error, err=True)
+        raise click.ClickException(f"{len(errors)} problem(s) found; nothing was imported")
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    imported = []
+    try:
+        for start in range(0, len(records), IMPORT_CHUNK_SIZE):
+            chunk = records[start:start + IMPORT_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"SELECT Email FROM Users WHERE Email IN ({placeholders})",
+                           [record["email"] for record in chunk])
+            existing = {email.lower() for (email,) in cursor.fetchall()}
+            chunk = [record for record in chunk if record["email"].lower() not in existing]
+            if not chunk:
+                continue
+
+            # Hash the whole chunk in parallel on the password pool
+            salts = [bcrypt_lib.gensalt(rounds=app.config['BCRYPT_LOG_ROUNDS']) for _ in chunk]
+            hashes = password_pool.map(bcrypt_lib.hashpw,
+                                       [record["password"].encode('utf-8') for record in chunk], salts)
+            cursor.executemany(
+                "INSERT INTO Users (Name, Email, Password, Role) VALUES (%s, %s, %s, %s)",
+                [(record["name"], record["email"], password_hash.decode('utf-8'), record["role"])
+                 for record, password_hash in zip(chunk, hashes)]
+            )
+
+            # Multi-row inserts need not get consecutive ids, so look them up
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"SELECT UserID, Email FROM Users WHERE Email IN ({placeholders})",
+                           [record["email"] for record in chunk])
+            user_ids = {email.lower(): user_id for user_id, email in cursor.fetchall()}
+            for role_name in REGISTRATION_ROLES:
+                rows = [(user_ids[record["email"].lower()], user_ids[record["email"].lower()],
+                         *record["details"].values())
+                        for record in chunk if record["role"] == role_name]
+                if rows:
+                    cursor.executemany(role_insert_sql(role_name), rows)
+            imported.extend(chunk)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    if credentials_out is not None:
+        writer = csv.writer(credentials_out)
+        writer.writerow(["email", "password"])
+        for record in imported:
+            if record["email"].lower() in generated:
+                writer.writerow([record["email"], record["password"]])
+    click.echo(f"Imported {len(imported)} user(s); {len(records) - len(imported)} already registered")
+
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
+        record, error = registration_record(request.form)
+        if error:
+            flash(error, "danger")
+            return redirect(url_for('register'))
+
         conn = None
         cursor = None
-
         try:
-            # Extract form data
-            name = request.form.get('name')
-            email = request.form.get('email')
-            password_raw = request.form.get('password')
-            role = request.form.get('role')
-
-            # Debugging: Print received data
-            print("\n--- Received Registration Data ---")
-            print(json.dumps(request.form.to_dict(), indent=4))
-
-            # Ensure required fields are present
-            if not all([name, email, password_raw, role]):
-                flash("All fields are required.", "danger")
-                return redirect(url_for('register'))
+            password = hash_password(record["password"])
 
+            # Users and the role row commit together; the unique index on
+            # Users.Email rejects duplicates
             conn = get_db_connection()
             cursor = conn.cursor()
-
-            # 🔹 **Check if the email is already registered**
-            cursor.execute("SELECT * FROM Users WHERE Email = %s", (email,))
-            existing_user = cursor.fetchone()
-
-            if existing_user:
-                flash("This email is already registered. Please use a different email.", "danger")
-                return redirect(url_for('register'))  # Show error on registration page
-
-            # 🔹 **Encrypt the password**
-            password = bcrypt.generate_password_hash(password_raw).decode('utf-8')
-
-            # 🔹 **Insert into Users table**
-            cursor.execute("INSERT INTO Users (Name, Email, Password, Role) VALUES (%s, %s, %s, %s)", 
-                           (name, email, password, role))
+            insert_registration(cursor, record, password)
             conn.commit()
-            user_id = cursor.lastrowid  # Get the new UserID
-
-            # 🔹 **Insert into role-specific tables**
-            if role == "Student":
-                batch_year = request.form.get('batch_year')
-                if not batch_year:
-                    flash("Batch year is required for students.", "danger")
-                    return redirect(url_for('register'))
-                cursor.execute("INSERT INTO Student (UserID, student_id, batch_year) VALUES (%s, %s, %s)", 
-                               (user_id, user_id, batch_year))
-
-            elif role == "Alumni":
-                grad_year = request.form.get('grad_year')
-                company = request.form.get('company', '')
-                designation = request.form.get('designation', '')
-                bio = request.form.get('bio', '')
-                if not grad_year:
-                    flash("Graduation year is required for alumni.", "danger")
-                    return redirect(url_for('register'))
-                cursor.execute("INSERT INTO Alumni (UserID, alumni_id, grad_year, company, designation, bio) VALUES (%s, %s, %s, %s, %s, %s)", 
-                               (user_id, user_id, grad_year, company, designation, bio))
-
-            elif role == "Admin":
-                position = request.form.get('position')
-                if not position:
-                    flash("Position is required for admins.", "danger")
-                    return redirect(url_for('register'))
-                cursor.execute("INSERT INTO Admin (UserID, admin_id, position) VALUES (%s, %s, %s)", 
-                               (user_id, user_id, position))
 
-            conn.commit()
+            if record["role"] == "Alumni":
+                alumni_directory.invalidate()
+                bump_content_version('alumni')
             flash("Registration successful!", "success")
             return redirect(url_for('home'))  # Redirect to home after successful registration
 
+        except PasswordPoolBusy:
+            flash("Too many people are signing up right now. Please try again in a moment.", "danger")
+
         except mysql.connector.Error as e:
+            if conn:
+                conn.rollback()
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                flash("This email is already registered. Please use a different email.", "danger")
+                return redirect(url_for('register'))
             print("\n--- MySQL Error ---")
             print(str(e))  # Print error in console
             flash(f"MySQL Error: {str(e)}", "danger")
 
         except Exception as e:
+            if conn:
+                conn.rollback()
             print("\n--- General Error ---")
             print(str(e))  # Print error in console
             flash(f"An error occurred: {str(e)}", "danger")
@@ -1507,6 +4788,15 @@ def register():
     return render_template('register.html')
 
 
+# Compile templates and pre-render static pages before the first request
+if os.getenv('TEMPLATE_WARMUP', 'true').lower() == 'true':
+    warm_templates()
+
+# Start loading the adaptive test statistics so the first test need not wait
+if os.getenv('ADAPTIVE_STATS_PRELOAD', 'true').lower() == 'true':
+    question_stats.refresh()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
 
@@ -0,0 +1,108 @@
+"""Rebuild time, memory and pick latency of the adaptive test statistics.
+
+Generates a synthetic question bank and response history (students of varying
+ability answering questions of varying difficulty), feeds it to
+QuestionStats.load() through an in-memory cursor so only the vectorized
+rebuild is timed, then times next-question picks and answer updates.
+
+    python benchmarks/bench_adaptive_test.py --questions 1000 50000 --responses 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np  # noqa: E402
+
+import app  # noqa: E402
+
+
+class SyntheticCursor:
+    def __init__(self, qn_ids, responses):
+        self.qn_ids = qn_ids
+        self.responses = responses
+        self.rows = []
+
+    def execute(self, query, params=None):
+        if 'FROM responses' in query:
+            self.rows = self.responses
+        else:
+            self.rows = [(int(qn_id),) for qn_id in self.qn_ids]
+        self.position = 0
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchmany(self, size):
+        rows = self.rows[self.position:self.position + size]
+        self.position += size
+        return rows
+
+    def close(self):
+        pass
+
+
+class SyntheticConnection:
+    def __init__(self, qn_ids, responses):
+        self.qn_ids = qn_ids
+        self.responses = responses
+
+    def cursor(self, **kwargs):
+        return SyntheticCursor(self.qn_ids, self.responses)
+
+
+def synthetic_history(questions, responses, students, rng):
+    qn_ids = np.arange(1, questions + 1)
+    ability = rng.normal(0, 1, students)
+    difficulty = rng.normal(0, 1.2, questions)
+    users = rng.integers(0, students, responses)
+    items = rng.integers(0, questions, responses)
+    correct = rng.random(responses) < 1 / (1 + np.exp(difficulty[items] - ability[users]))
+    rows = list(zip((users + 1).tolist(), qn_ids[items].tolist(), correct.astype(int).tolist()))
+    return qn_ids, rows
+
+
+def percentile(samples, fraction):
+    return sorted(samples)[int(fraction * (len(samples) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, nargs='+', default=[1000, 50000])
+    parser.add_argument('--responses', type=int, default=1000000)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--picks', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'questions':>10} {'responses':>10} {'load s':>8} {'arrays KiB':>11} "
+          f"{'pick p50 us':>12} {'pick p99 us':>12} {'record us':>10}")
+    for questions in args.questions:
+        qn_ids, rows = synthetic_history(questions, args.responses, args.students, rng)
+        stats = app.QuestionStats()
+        stats.load(SyntheticConnection(qn_ids, rows))
+
+        abilities = rng.normal(0, 1, args.picks).tolist()
+        served = set(rng.choice(qn_ids, 9).tolist())
+        timings = []
+        for ability in abilities:
+            started = time.perf_counter()
+            stats.pick(ability, exclude=served)
+            timings.append((time.perf_counter() - started) * 1e6)
+
+        started = time.perf_counter()
+        for i, ability in enumerate(abilities):
+            stats.record(int(qn_ids[i % questions]), 1, i % 2, ability)
+        record_us = (time.perf_counter() - started) * 1e6 / len(abilities)
+
+        print(f"{questions:>10} {args.responses:>10} {stats.load_seconds:>8.2f} "
+              f"{stats.stats()['array_bytes'] / 1024:>11.1f} {statistics.median(timings):>12.1f} "
+              f"{percentile(timings, 0.99):>12.1f} {record_us:>10.2f}")
+    app.password_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
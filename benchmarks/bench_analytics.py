@@ -0,0 +1,88 @@
+"""Latency of the admin analytics reports over large synthetic snapshots.
+
+Builds a columnar snapshot in memory at each size (no database needed),
+saves it to a temporary directory and loads it back memory-mapped, then
+times every report with and without a date filter on both copies.
+
+    python benchmarks/bench_analytics.py --rows 1000000 5000000 --students 50000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np  # noqa: E402
+
+import app  # noqa: E402
+
+LANGUAGES = ["python", "java", "cpp", "c", "javascript"]
+
+
+def synthetic_snapshot(rows, students, rng):
+    batches = rng.integers(0, 6, students).astype(np.int32)
+    days = lambda n: rng.integers(19000, 20000, n).astype(np.int32)  # noqa: E731
+    # Row `students` stands for users who are not students
+    student = lambda n: rng.integers(0, students + 1, n)  # noqa: E731
+    interviews = max(rows // 50, 1)
+    return {
+        "columns": {
+            "students.user_id": np.arange(1, students + 1, dtype=np.int64),
+            "students.batch": batches,
+            "responses.student": student(rows),
+            "responses.correct": (rng.random(rows) < 0.6).astype(np.int8),
+            "responses.day": days(rows),
+            "submissions.student": student(rows // 4),
+            "submissions.language": rng.integers(0, len(LANGUAGES), rows // 4).astype(np.int32),
+            "submissions.accepted": (rng.random(rows // 4) < 0.4).astype(np.int8),
+            "submissions.day": days(rows // 4),
+            "interviews.student": student(interviews),
+            "interviews.rating": rng.integers(1, 6, interviews).astype(np.int8),
+            "interviews.day": days(interviews),
+        },
+        "dictionaries": {
+            "students.batch": [str(2020 + i) for i in range(6)],
+            "submissions.language": LANGUAGES,
+        },
+        "built_at": time.time(),
+        "build_seconds": 0.0,
+    }
+
+
+def time_report(snapshot, name, since, until, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        app.ANALYTICS_REPORTS[name](snapshot, since, until)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000000, 5000000],
+                        help='aptitude responses; submissions are a quarter, interviews a fiftieth')
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    filters = {"all": (None, None), "90 days": (19500, 19590)}
+    print(f"{'rows':>9} {'copy':<7} {'filter':<8} " + " ".join(f"{name + ' ms':>14}" for name in app.ANALYTICS_REPORTS))
+    for rows in args.rows:
+        snapshot = synthetic_snapshot(rows, args.students, rng)
+        with tempfile.TemporaryDirectory() as directory:
+            app.save_analytics_snapshot(snapshot, directory)
+            copies = {"memory": snapshot, "mmap": app.load_analytics_snapshot(directory)}
+            for copy, data in copies.items():
+                for label, (since, until) in filters.items():
+                    times = [time_report(data, name, since, until, args.repeats) for name in app.ANALYTICS_REPORTS]
+                    print(f"{rows:>9} {copy:<7} {label:<8} " + " ".join(f"{ms:>14.1f}" for ms in times))
+    app.password_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Throughput benchmark for the code execution backends.
+
+Runs the same small Python and C programs through each configured backend
+and reports submissions per second. The Judge0 backend is only measured when
+JUDGE0_API_URL is set (point it at a local Judge0 to keep quota untouched).
+
+    python benchmarks/bench_executors.py --submissions 40 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+
+PROGRAMS = {
+    "python": (app.LANGUAGE_IDS["python"], "n = int(input())\nprint(sum(range(n)))\n"),
+    "c": (app.LANGUAGE_IDS["c"],
+          '#include <stdio.h>\nint main(){long n,s=0;scanf("%ld",&n);'
+          'for(long i=0;i<n;i++)s+=i;printf("%ld\\n",s);return 0;}\n'),
+}
+
+
+def bench(executor, language_id, source, submissions, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: executor.run(source, language_id, "100000"), range(submissions)))
+    elapsed = time.perf_counter() - started
+    accepted = sum(1 for result in results if result.get("status_id") == 3)
+    return elapsed, accepted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--submissions', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    backends = [app.LocalExecutor(workers=args.concurrency)]
+    if app.JUDGE0_API_URL:
+        backends.append(app.Judge0Executor())
+
+    print(f"{'backend':<8} {'language':<8} {'subs/s':>8} {'avg ms':>8} {'accepted':>9}")
+    for executor in backends:
+        for language, (language_id, source) in PROGRAMS.items():
+            elapsed, accepted = bench(executor, language_id, source, args.submissions, args.concurrency)
+            print(f"{executor.name:<8} {language:<8} {args.submissions / elapsed:>8.1f} "
+                  f"{elapsed * 1000 * args.concurrency / args.submissions:>8.1f} "
+                  f"{accepted:>4}/{args.submissions}")
+
+
+if __name__ == '__main__':
+    main()
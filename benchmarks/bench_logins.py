@@ -0,0 +1,72 @@
+"""Login throughput benchmark for password verification.
+
+Verifies the same password repeatedly at each bcrypt cost, first inline on
+request-style threads (the old login path) and then through the password
+process pool, and reports logins per second overall and per core. While the
+logins run, a separate thread times a small pure-Python task to show how much
+other requests are slowed down.
+
+    python benchmarks/bench_logins.py --logins 64 --concurrency 16 --rounds 10 12
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def side_task_latency(stop, samples):
+    # Stand-in for an unrelated request being served next to the login storm
+    while not stop.is_set():
+        started = time.perf_counter()
+        sum(i * i for i in range(20000))
+        samples.append(time.perf_counter() - started)
+        time.sleep(0.005)
+
+
+def bench(verify, stored_hash, logins, concurrency):
+    stop, samples = threading.Event(), []
+    side = threading.Thread(target=side_task_latency, args=(stop, samples))
+    side.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: verify(stored_hash, PASSWORD), range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    side.join()
+    assert all(results)
+    return elapsed, statistics.median(samples) * 1000 if samples else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12])
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, {app.BCRYPT_WORKERS} password pool workers")
+    print(f"{'rounds':>6} {'path':<7} {'logins/s':>9} {'per core':>9} {'side p50 ms':>12}")
+    for rounds in args.rounds:
+        stored_hash = app.bcrypt_lib.hashpw(PASSWORD.encode('utf-8'),
+                                            app.bcrypt_lib.gensalt(rounds)).decode('utf-8')
+        app.check_password(stored_hash, PASSWORD)  # start the pool workers
+        for path, verify in (("inline", app.bcrypt.check_password_hash),
+                             ("pool", app.check_password)):
+            elapsed, side_ms = bench(verify, stored_hash, args.logins, args.concurrency)
+            rate = args.logins / elapsed
+            print(f"{rounds:>6} {path:<7} {rate:>9.1f} {rate / cores:>9.2f} {side_ms:>12.2f}")
+    app.password_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Query latency of the admin Q&A search at growing question counts.
+
+Fills a scratch MySQL database with synthetic questions and answers and times
+the FULLTEXT search used by /admin/get_qnas against the old LIKE scan.
+Needs an empty database it is allowed to drop tables in:
+
+    DB_HOST=... DB_USER=... DB_PASSWORD=... \\
+        python benchmarks/bench_qna_search.py --database ccc_bench --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import mysql.connector  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+WORDS = ("interview resume placement aptitude coding python java salary internship offer "
+         "company project manager startup design database networking cloud frontend backend "
+         "algorithm preparation experience mentor career higher studies abroad research").split()
+
+SCHEMA = [
+    "DROP TABLE IF EXISTS answers",
+    "DROP TABLE IF EXISTS questions",
+    "DROP TABLE IF EXISTS Users",
+    """CREATE TABLE Users (UserID INT AUTO_INCREMENT PRIMARY KEY, Name VARCHAR(100))""",
+    """CREATE TABLE questions (
+        id INT AUTO_INCREMENT PRIMARY KEY, user_id INT, question_text TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_questions_created_id (created_at, id),
+        FULLTEXT INDEX ft_questions_text (question_text))""",
+    """CREATE TABLE answers (
+        id INT AUTO_INCREMENT PRIMARY KEY, question_id INT, user_id INT, answer_text TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_answers_question (question_id),
+        FULLTEXT INDEX ft_answers_text (answer_text))""",
+]
+
+FULLTEXT_QUERY = """
+    SELECT q.id, q.question_text, m.relevance
+    FROM questions q
+    JOIN (
+        SELECT id, SUM(score) AS relevance FROM (
+            SELECT id, MATCH(question_text) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM questions WHERE MATCH(question_text) AGAINST (%s IN BOOLEAN MODE)
+            UNION ALL
+            SELECT question_id, MATCH(answer_text) AGAINST (%s IN BOOLEAN MODE)
+            FROM answers WHERE MATCH(answer_text) AGAINST (%s IN BOOLEAN MODE)
+        ) hits GROUP BY id
+    ) m ON m.id = q.id
+    ORDER BY m.relevance DESC, q.created_at DESC
+    LIMIT 20
+"""
+
+LIKE_QUERY = """
+    SELECT q.id, q.question_text
+    FROM questions q
+    LEFT JOIN answers a ON q.id = a.question_id
+    WHERE q.question_text LIKE %s
+    ORDER BY q.created_at DESC
+    LIMIT 20
+"""
+
+
+def sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)) + "?"
+
+
+def grow(conn, current, target, rng, chunk=5000):
+    cursor = conn.cursor()
+    if current == 0:
+        cursor.executemany("INSERT INTO Users (Name) VALUES (%s)", [(f"user{i}",) for i in range(100)])
+    while current < target:
+        batch = min(chunk, target - current)
+        cursor.executemany(
+            "INSERT INTO questions (user_id, question_text) VALUES (%s, %s)",
+            [(rng.randint(1, 100), sentence(rng, rng.randint(6, 20))) for _ in range(batch)]
+        )
+        first_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO answers (question_id, user_id, answer_text) VALUES (%s, %s, %s)",
+            [(first_id + i, rng.randint(1, 100), sentence(rng, rng.randint(10, 40)))
+             for i in range(batch) if rng.random() < 0.6]
+        )
+        conn.commit()
+        current += batch
+    cursor.close()
+    return current
+
+
+def time_query(conn, sql, params, repeats):
+    cursor = conn.cursor()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    cursor.close()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True, help='Scratch database; its Q&A tables are dropped')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(host=os.getenv('DB_HOST'), user=os.getenv('DB_USER'),
+                                   password=os.getenv('DB_PASSWORD'), database=args.database)
+    cursor = conn.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    cursor.close()
+
+    rng = random.Random(42)
+    rows = 0
+    print(f"{'questions':>10} {'fulltext ms':>12} {'like ms':>10}")
+    for size in sorted(args.sizes):
+        rows = grow(conn, rows, size, rng)
+        boolean_query = "+placement* +interview*"
+        fulltext_ms = time_query(conn, FULLTEXT_QUERY, [boolean_query] * 4, args.repeats)
+        like_ms = time_query(conn, LIKE_QUERY, ["%placement interview%"], args.repeats)
+        print(f"{size:>10} {fulltext_ms:>12.2f} {like_ms:>10.2f}")
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Response time and peak RSS of the admin question listing.
+
+Fills a scratch MySQL database with synthetic aptitude questions and, at each
+size, requests /get_questions through the Flask test client: once the old way
+(every row, options decoded, one big JSON array) and once as a single
+paginated page. Each measurement runs in a fresh process so its peak RSS is
+its own. Needs an empty database it is allowed to drop tables in:
+
+    DB_HOST=... DB_USER=... DB_PASSWORD=... \\
+        python benchmarks/bench_question_listing.py --database ccc_bench --sizes 1000 50000 500000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import mysql.connector  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+WORDS = ("train speed distance ratio percentage profit loss interest average ages work time "
+         "probability series pattern clock calendar boat stream mixture partnership").split()
+
+SCHEMA = [
+    "DROP TABLE IF EXISTS aptitude_test",
+    """CREATE TABLE aptitude_test (
+        qn_id INT AUTO_INCREMENT PRIMARY KEY, qn_text TEXT, options JSON, corr_opt CHAR(1),
+        test_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_aptitude_test_date_id (test_date, qn_id),
+        FULLTEXT INDEX ft_aptitude_test_text (qn_text))""",
+]
+
+# What /get_questions did before it was paginated
+OLD_QUERY = """
+    SELECT qn_id, qn_text, options, corr_opt,
+           DATE_FORMAT(test_date, '%Y-%m-%d %H:%i:%s') AS test_date
+    FROM aptitude_test
+    ORDER BY test_date DESC
+"""
+
+
+def connect(database):
+    return mysql.connector.connect(host=os.getenv('DB_HOST'), user=os.getenv('DB_USER'),
+                                   password=os.getenv('DB_PASSWORD'), database=database)
+
+
+def grow(conn, current, target, rng, chunk=5000):
+    cursor = conn.cursor()
+    while current < target:
+        batch = min(chunk, target - current)
+        cursor.executemany(
+            "INSERT INTO aptitude_test (qn_text, options, corr_opt, test_date) "
+            "VALUES (%s, %s, %s, NOW() - INTERVAL %s MINUTE)",
+            [(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))) + "?",
+              json.dumps({key: str(rng.randint(1, 999)) for key in "ABCD"}),
+              rng.choice("ABCD"), rng.randint(0, 500000))
+             for _ in range(batch)]
+        )
+        conn.commit()
+        current += batch
+    cursor.close()
+    return current
+
+
+def measure(database, variant, repeats):
+    """Run inside a child process; prints median ms and peak RSS in KiB"""
+    os.environ['DB_NAME'] = database
+    os.environ['TEMPLATE_WARMUP'] = 'false'
+    os.environ['ADAPTIVE_STATS_PRELOAD'] = 'false'
+    import app
+
+    def old_listing():
+        conn = app.get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(OLD_QUERY)
+        questions = cursor.fetchall()
+        for question in questions:
+            question['options'] = json.loads(question['options'])
+        cursor.close()
+        conn.close()
+        return app.jsonify(questions)
+
+    if variant == 'old':
+        app.app.add_url_rule('/bench/old_questions', 'bench_old_questions', old_listing)
+        url = '/bench/old_questions'
+    else:
+        url = '/get_questions?page=50&per_page=20'
+
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['loggedin'] = True
+        sess['id'] = 1
+        sess['role'] = 'Admin'
+
+    timings = []
+    for _ in range(repeats):
+        app.response_cache.invalidate()
+        started = time.perf_counter()
+        response = client.get(url)
+        response.get_data()
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    print(json.dumps({"ms": statistics.median(timings),
+                      "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True, help='Scratch database; its aptitude_test table is dropped')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 50000, 500000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--measure', choices=['old', 'paged'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.database, args.measure, args.repeats)
+        return
+
+    conn = connect(args.database)
+    cursor = conn.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    cursor.close()
+
+    rng = random.Random(42)
+    rows = 0
+    print(f"{'questions':>10} {'old ms':>10} {'old RSS MiB':>12} {'paged ms':>10} {'paged RSS MiB':>14}")
+    for size in sorted(args.sizes):
+        rows = grow(conn, rows, size, rng)
+        results = {}
+        for variant in ('old', 'paged'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--database', args.database, '--measure', variant,
+                 '--repeats', str(args.repeats)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[variant] = json.loads(output.strip().splitlines()[-1])
+        print(f"{size:>10} {results['old']['ms']:>10.1f} {results['old']['rss_kib'] / 1024:>12.1f} "
+              f"{results['paged']['ms']:>10.1f} {results['paged']['rss_kib'] / 1024:>14.1f}")
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+-- Hidden test cases per coding challenge, judged together through
+-- Judge0's /submissions/batch endpoint.
+CREATE TABLE IF NOT EXISTS challenge_test_cases (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    challenge_id INT NOT NULL,
+    position INT NOT NULL DEFAULT 0,
+    stdin TEXT NOT NULL,
+    expected_output TEXT NOT NULL,
+    is_hidden BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_test_cases_challenge (challenge_id, position),
+    FOREIGN KEY (challenge_id) REFERENCES coding_challenges(id) ON DELETE CASCADE
+);
+
+-- Per-test-case verdicts for each row in coding_submissions
+CREATE TABLE IF NOT EXISTS coding_submission_results (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    submission_id INT NOT NULL,
+    test_case_id INT NULL,
+    status VARCHAR(64) NOT NULL,
+    passed BOOLEAN NOT NULL DEFAULT FALSE,
+    time VARCHAR(16),
+    memory INT,
+    INDEX idx_submission_results_submission (submission_id),
+    FOREIGN KEY (submission_id) REFERENCES coding_submissions(id) ON DELETE CASCADE
+);
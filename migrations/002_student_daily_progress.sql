@@ -0,0 +1,10 @@
+-- Per-student, per-day rollup behind the progress dashboard. Rows are kept
+-- current by the write routes; rebuild with `flask backfill-progress`.
+CREATE TABLE IF NOT EXISTS student_daily_progress (
+    user_id INT NOT NULL,
+    day DATE NOT NULL,
+    metric VARCHAR(32) NOT NULL,
+    total DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    samples INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, metric, day)
+);
@@ -0,0 +1,5 @@
+-- Keyset pagination of the Q&A feed walks questions by (created_at, id)
+CREATE INDEX idx_questions_created_id ON questions (created_at, id);
+
+-- Answers are joined to each page of questions by question_id
+CREATE INDEX idx_answers_question ON answers (question_id);
@@ -0,0 +1,3 @@
+-- Full-text indexes behind the admin Q&A search
+CREATE FULLTEXT INDEX ft_questions_text ON questions (question_text);
+CREATE FULLTEXT INDEX ft_answers_text ON answers (answer_text);
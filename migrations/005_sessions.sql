@@ -0,0 +1,8 @@
+-- Server-side session records for SESSION_BACKEND=sql. The cookie carries
+-- only `id`; expired rows are purged opportunistically on write.
+CREATE TABLE IF NOT EXISTS sessions (
+    id VARCHAR(64) NOT NULL PRIMARY KEY,
+    data MEDIUMTEXT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    INDEX idx_sessions_expires_at (expires_at)
+);
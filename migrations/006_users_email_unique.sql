@@ -0,0 +1,4 @@
+-- Registration relies on this index to reject duplicate emails inside its
+-- transaction. If it fails, list the duplicates first with:
+--   SELECT Email, COUNT(*) FROM Users GROUP BY Email HAVING COUNT(*) > 1;
+ALTER TABLE Users ADD UNIQUE INDEX uq_users_email (Email);
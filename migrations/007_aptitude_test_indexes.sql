@@ -0,0 +1,4 @@
+-- Indexes behind the paginated admin question list (/get_questions):
+-- date-ordered paging and full-text search over question text.
+CREATE INDEX idx_aptitude_test_date_id ON aptitude_test (test_date, qn_id);
+CREATE FULLTEXT INDEX ft_aptitude_test_text ON aptitude_test (qn_text);
@@ -0,0 +1,12 @@
+-- Queued code submissions for CODE_JOB_BACKEND=sql, so whichever worker
+-- answers a poll can see the job. Rows older than CODE_JOB_TTL are purged
+-- when a new job is queued.
+CREATE TABLE IF NOT EXISTS code_jobs (
+    id CHAR(32) NOT NULL PRIMARY KEY,
+    user_id INT NOT NULL,
+    state VARCHAR(16) NOT NULL,
+    result MEDIUMTEXT NULL,
+    http_status SMALLINT NULL,
+    updated_at DATETIME NOT NULL,
+    INDEX idx_code_jobs_updated_at (updated_at)
+);
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Importing app must not render every template or need a database
+os.environ.setdefault('TEMPLATE_WARMUP', 'false')
+os.environ.setdefault('ADAPTIVE_STATS_PRELOAD', 'false')
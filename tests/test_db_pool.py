@@ -0,0 +1,166 @@
+"""ConnectionPool against an in-memory stand-in for mysql.connector connections."""
+import threading
+import time
+
+import mysql.connector
+import pytest
+
+import app
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise mysql.connector.errors.InterfaceError("MySQL server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def is_connected(self):
+        return self.alive and not self.closed
+
+
+class FakeConnect:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.opened) + 1)
+        self.opened.append(conn)
+        return conn
+
+
+@pytest.fixture
+def connect():
+    return FakeConnect()
+
+
+def test_checkout_and_return_reuses_connection(connect):
+    pool = app.ConnectionPool(connect, size=2, max_overflow=0, timeout=1)
+    first = pool.checkout()
+    pool.release(first)
+    second = pool.checkout()
+
+    assert second is first
+    assert len(connect.opened) == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["misses"] == 1
+    assert stats["in_use"] == 1
+
+
+def test_pooled_connection_close_returns_to_pool(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=1)
+    conn = app.PooledConnection(pool, pool.checkout())
+    conn.close()
+
+    assert pool.stats()["idle"] == 1
+    assert not conn.is_connected()
+    with pytest.raises(mysql.connector.errors.OperationalError):
+        conn.cursor()
+
+
+def test_overflow_up_to_limit_then_closed_on_return(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=2, timeout=0.05)
+    held = [pool.checkout() for _ in range(3)]
+
+    assert len(connect.opened) == 3
+    assert pool.stats()["open"] == 3
+    with pytest.raises(mysql.connector.errors.PoolError):
+        pool.checkout()
+
+    for conn in held:
+        pool.release(conn)
+    # Only `size` connections are kept idle; the overflow ones are closed
+    assert pool.stats()["idle"] == 1
+    assert pool.stats()["open"] == 1
+    assert [conn.closed for conn in held] == [False, True, True]
+
+
+def test_timeout_when_exhausted(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=0.1)
+    pool.checkout()
+
+    started = time.monotonic()
+    with pytest.raises(mysql.connector.errors.PoolError):
+        pool.checkout()
+    assert time.monotonic() - started >= 0.1
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_connection_released_by_another_thread(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=2)
+    conn = pool.checkout()
+    releaser = threading.Timer(0.05, pool.release, args=(conn,))
+    releaser.start()
+
+    assert pool.checkout() is conn
+    releaser.join()
+    assert pool.stats()["waits"] >= 1
+
+
+def test_broken_connection_replaced_after_health_check(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=1)
+    conn = pool.checkout()
+    pool.release(conn)
+    conn.alive = False
+
+    replacement = pool.checkout()
+
+    assert replacement is not conn
+    assert conn.closed
+    assert len(connect.opened) == 2
+    stats = pool.stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["open"] == 1
+
+
+def test_failed_connect_frees_the_slot():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        raise mysql.connector.errors.InterfaceError("Can't connect")
+
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(mysql.connector.errors.InterfaceError):
+            pool.checkout()
+    assert len(attempts) == 2
+    assert pool.stats()["open"] == 0
+
+
+def test_release_rolls_back_open_transaction(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=1)
+    conn = pool.checkout()
+    conn.in_transaction = True
+    pool.release(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.checkout() is conn
+
+
+def test_release_discards_connection_when_rollback_fails(connect):
+    pool = app.ConnectionPool(connect, size=1, max_overflow=0, timeout=1)
+    conn = pool.checkout()
+    conn.in_transaction = True
+
+    def broken_rollback():
+        raise mysql.connector.errors.OperationalError("Lost connection")
+    conn.rollback = broken_rollback
+    pool.release(conn)
+
+    assert conn.closed
+    assert pool.stats()["open"] == 0
+    assert pool.checkout() is not conn
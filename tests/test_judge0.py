@@ -0,0 +1,401 @@
+"""Judge0 client and the queued submission routes against a stubbed Judge0 HTTP client."""
+import base64
+import time
+
+import pytest
+import requests
+
+import app
+
+
+def b64(text):
+    return base64.b64encode(text.encode()).decode()
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error")
+
+
+class FakeJudge0:
+    """Each submitted stdin maps to the list of results successive polls return.
+
+    Serves both the batch endpoints and single /submissions; with wait=true a
+    single submission answers with the first result straight away.
+    """
+
+    def __init__(self, scripts, fail_submit=False, fail_poll=False):
+        self.scripts = scripts
+        self.fail_submit = fail_submit
+        self.fail_poll = fail_poll
+        self.batches = []
+        self.singles = []
+        self.polls = []
+        self.pending = {}
+
+    def next_result(self, token):
+        script = self.pending[token]
+        return script.pop(0) if len(script) > 1 else script[0]
+
+    def post(self, url, json=None, headers=None, params=None):
+        if self.fail_submit:
+            raise requests.exceptions.ConnectionError("connection refused")
+        if url.endswith("/submissions"):
+            return self.post_single(json, params or {})
+        assert url.endswith("/submissions/batch")
+        self.batches.append(json["submissions"])
+        tokens = []
+        for submission in json["submissions"]:
+            token = f"token-{len(self.pending)}"
+            self.pending[token] = list(self.scripts[submission["stdin"]])
+            tokens.append({"token": token})
+        return FakeResponse(tokens)
+
+    def post_single(self, payload, params):
+        self.singles.append((payload, params))
+        stdin = payload["stdin"]
+        if params.get("base64_encoded") == "true":
+            stdin = base64.b64decode(stdin).decode()
+        token = f"token-{len(self.pending)}"
+        self.pending[token] = list(self.scripts[stdin])
+        if params.get("wait") == "true":
+            return FakeResponse({"token": token, **self.next_result(token)})
+        return FakeResponse({"token": token})
+
+    def get(self, url, headers=None, params=None):
+        if self.fail_poll:
+            return FakeResponse({"error": "boom"}, status_code=503)
+        if not url.endswith("/submissions/batch"):
+            token = url.rsplit("/", 1)[-1]
+            self.polls.append([token])
+            return FakeResponse(self.next_result(token))
+        tokens = params["tokens"].split(",")
+        self.polls.append(tokens)
+        return FakeResponse({"submissions": [self.next_result(token) for token in tokens]})
+
+
+QUEUED = {"status": {"id": 1}}
+RUNNING = {"status": {"id": 2}}
+
+
+def done(status_id, stdout=""):
+    return {"status": {"id": status_id}, "stdout": b64(stdout), "time": "0.01", "memory": 1024}
+
+
+class FakeClock:
+    """Stands in for app.time so backoff and timeouts run without waiting."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeChallengeDB:
+    """get_db_connection() stand-in serving one challenge and its test cases."""
+
+    def __init__(self, test_cases):
+        self.test_cases = test_cases
+        self.queries = []
+        self.rows = []
+        self.lastrowid = 1
+
+    def __call__(self):
+        return self
+
+    def cursor(self, **kwargs):
+        return self
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        if "FROM coding_challenges" in query:
+            self.rows = [{"expected_output": ""}]
+        elif "FROM challenge_test_cases" in query:
+            self.rows = [dict(case) for case in self.test_cases]
+        else:
+            self.rows = []
+
+    executemany = execute
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def judge0(monkeypatch):
+    monkeypatch.setattr(app, "JUDGE0_API_URL", "http://judge0.test")
+    monkeypatch.setattr(app, "JUDGE0_BATCH_SIZE", 2)
+    monkeypatch.setattr(app, "JUDGE0_POLL_INITIAL", 0.001)
+    monkeypatch.setattr(app, "JUDGE0_POLL_MAX", 0.002)
+    monkeypatch.setattr(app, "JUDGE0_POLL_TIMEOUT", 5)
+
+    def install(fake):
+        monkeypatch.setattr(app, "judge0_http", fake)
+        return fake
+    return install
+
+
+def cases(*pairs):
+    return [{"stdin": stdin, "expected_output": expected} for stdin, expected in pairs]
+
+
+def test_batch_submit_in_chunks_and_poll_until_complete(judge0):
+    fake = judge0(FakeJudge0({
+        "1": [QUEUED, RUNNING, done(3, "2\n")],
+        "2": [done(3, "4\n")],
+        "3": [RUNNING, RUNNING, RUNNING, done(3, "6\n")],
+    }))
+
+    results = app.judge_test_cases("print(int(input()) * 2)", 71, cases(("1", "2"), ("2", "4"), ("3", "6")))
+
+    assert [len(batch) for batch in fake.batches] == [2, 1]
+    assert [r["verdict"] for r in results] == ["Accepted"] * 3
+    assert all(r["passed"] for r in results)
+    assert results[0]["stdout"] == "2\n"
+    # Finished cases are not polled again
+    assert fake.polls[0] == ["token-0", "token-1"]
+    assert "token-1" not in sum(fake.polls[2:], [])
+    assert fake.polls[-1] == ["token-2"]
+
+
+def test_verdict_mapping(judge0):
+    judge0(FakeJudge0({
+        "ok": [done(3, "yes")],
+        "wrong": [done(3, "no")],
+        "tle": [done(5)],
+        "ce": [done(6)],
+        "segv": [done(7)],
+        "nzec": [done(11)],
+    }))
+
+    results = app.judge_test_cases("code", 71, cases(
+        ("ok", "yes\n"), ("wrong", "yes"), ("tle", ""), ("ce", ""), ("segv", ""), ("nzec", "")))
+
+    assert [(r["verdict"], r["passed"]) for r in results] == [
+        ("Accepted", True),
+        ("Wrong Answer", False),
+        ("Time Limit Exceeded", False),
+        ("Compilation Error", False),
+        ("Runtime Error (SIGSEGV)", False),
+        ("Runtime Error (NZEC)", False),
+    ]
+
+
+def test_fail_fast_skips_unfinished_cases(judge0):
+    fake = judge0(FakeJudge0({
+        "a": [done(3, "wrong")],
+        "b": [QUEUED],
+    }))
+
+    results = app.judge_test_cases("code", 71, cases(("a", "right"), ("b", "x")), fail_fast=True)
+
+    assert results[0]["verdict"] == "Wrong Answer"
+    assert results[1]["verdict"] == "Skipped"
+    assert not results[1]["passed"]
+    assert len(fake.polls) == 1
+
+
+def test_poll_timeout_reports_processing(judge0, monkeypatch):
+    monkeypatch.setattr(app, "JUDGE0_POLL_TIMEOUT", 0.01)
+    judge0(FakeJudge0({"a": [done(3, "1")], "b": [QUEUED]}))
+
+    results = app.judge_test_cases("code", 71, cases(("a", "1"), ("b", "2")))
+
+    assert results[0]["verdict"] == "Accepted"
+    assert results[1]["verdict"] == "Processing"
+    assert not results[1]["passed"]
+
+
+def test_missing_token_is_an_error(judge0):
+    fake = judge0(FakeJudge0({"a": [done(3, "1")]}))
+    post = fake.post
+
+    def post_without_token(url, json=None, headers=None):
+        response = post(url, json=json, headers=headers)
+        response.payload[0] = {"error": "queue full"}
+        return response
+    fake.post = post_without_token
+
+    results = app.judge_test_cases("code", 71, cases(("a", "1")))
+
+    assert results == [{"error": "Failed to submit code for execution", "verdict": "Error", "passed": False}]
+
+
+@pytest.mark.parametrize("failure", ["fail_submit", "fail_poll"])
+def test_http_errors_fail_every_unfinished_case(judge0, failure):
+    judge0(FakeJudge0({"a": [done(3, "1")], "b": [done(3, "2")]}, **{failure: True}))
+
+    results = app.judge_test_cases("code", 71, cases(("a", "1"), ("b", "2")))
+
+    assert [r["verdict"] for r in results] == ["Error", "Error"]
+    assert all(r["error"].startswith("Judge0 API Error:") for r in results)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(app, "time", fake)
+    return fake
+
+
+def test_poll_backs_off_until_finished(judge0, clock, monkeypatch):
+    monkeypatch.setattr(app, "JUDGE0_POLL_INITIAL", 0.2)
+    monkeypatch.setattr(app, "JUDGE0_POLL_MAX", 1.0)
+    fake = judge0(FakeJudge0({}))
+    fake.pending["t"] = [QUEUED, RUNNING, RUNNING, RUNNING, done(3, "ok")]
+
+    result = app.poll_judge0("t", {})
+
+    assert result["status"]["id"] == 3
+    assert clock.sleeps == [0.2, 0.4, 0.8, 1.0]
+    assert len(fake.polls) == 5
+
+
+def test_poll_returns_pending_result_at_timeout(judge0, clock, monkeypatch):
+    monkeypatch.setattr(app, "JUDGE0_POLL_INITIAL", 0.2)
+    monkeypatch.setattr(app, "JUDGE0_POLL_MAX", 1.0)
+    monkeypatch.setattr(app, "JUDGE0_POLL_TIMEOUT", 1.0)
+    fake = judge0(FakeJudge0({}))
+    fake.pending["t"] = [QUEUED]
+
+    result = app.poll_judge0("t", {})
+
+    assert result["status"]["id"] == 1
+    # The next sleep would overshoot the deadline, so it stops polling instead
+    assert clock.sleeps == [0.2, 0.4]
+    assert clock.now <= 1.0
+    assert len(fake.polls) == 3
+
+
+def test_wait_sends_base64_and_skips_polling(judge0, monkeypatch):
+    monkeypatch.setattr(app, "JUDGE0_WAIT", True)
+    fake = judge0(FakeJudge0({"5": [done(3, "10\n")]}))
+
+    result = app.submit_to_judge0("print(int(input()) * 2)", 71, "5")
+
+    payload, params = fake.singles[0]
+    assert payload["source_code"] == b64("print(int(input()) * 2)")
+    assert payload["stdin"] == b64("5")
+    assert params["wait"] == "true" and params["base64_encoded"] == "true"
+    assert result["status_id"] == 3
+    assert result["stdout"] == "10\n"
+    assert fake.polls == []
+
+
+def test_wait_falls_back_to_polling_while_pending(judge0, monkeypatch):
+    monkeypatch.setattr(app, "JUDGE0_WAIT", True)
+    fake = judge0(FakeJudge0({"5": [QUEUED, RUNNING, done(3, "10\n")]}))
+
+    result = app.submit_to_judge0("print(int(input()) * 2)", 71, "5")
+
+    assert result["stdout"] == "10\n"
+    assert fake.polls == [["token-0"], ["token-0"]]
+
+
+@pytest.fixture
+def students(monkeypatch):
+    monkeypatch.setattr(app.app, "secret_key", "test")
+    monkeypatch.setattr(app, "code_jobs", app.MemoryCodeJobStore(ttl=600))
+
+    def login(user_id):
+        client = app.app.test_client()
+        with client.session_transaction() as session:
+            session.update({"id": user_id, "loggedin": True, "role": "Student"})
+        return client
+    return login
+
+
+def wait_for_job(client, poll_url):
+    for _ in range(500):
+        body = client.get(poll_url).get_json()
+        if body["state"] == "done":
+            return body
+        assert body["state"] in ("queued", "running")
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_queued_submission_is_polled_until_done(judge0, students, monkeypatch):
+    judge0(FakeJudge0({"1": [QUEUED, done(3, "2\n")], "2": [done(3, "5\n")]}))
+    monkeypatch.setattr(app, "get_db_connection", FakeChallengeDB([
+        {"id": 1, "stdin": "1", "expected_output": "2", "is_hidden": False},
+        {"id": 2, "stdin": "2", "expected_output": "4", "is_hidden": True},
+    ]))
+    owner = students(7)
+
+    response = owner.post("/api/code-submissions", json={
+        "challenge_id": 1, "code": "print(int(input()) * 2)  # queued", "language": "python"})
+
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job["state"] == "queued"
+    body = wait_for_job(owner, job["poll_url"])
+    assert body["http_status"] == 200
+    result = body["result"]
+    assert result["status"] == "Wrong Answer"
+    assert (result["passed"], result["total"]) == (1, 2)
+    assert "output" not in result["test_cases"][1]
+
+    assert students(8).get(job["poll_url"]).status_code == 404
+    assert app.app.test_client().get(job["poll_url"]).status_code == 401
+
+
+def test_queueing_requires_challenge_and_code(students):
+    response = students(7).post("/api/code-submissions", json={"challenge_id": 1})
+
+    assert response.status_code == 400
+
+
+def test_jobs_expire_by_age_in_any_state(clock):
+    store = app.MemoryCodeJobStore(ttl=60)
+    store.create("stuck", 7)
+    store.create("finished", 7)
+    store.update("finished", "done", {}, 200)
+    clock.now = 61
+    store.create("fresh", 7)
+
+    store.prune()
+
+    assert store.get("stuck") is None
+    assert store.get("finished") is None
+    assert store.get("fresh")["state"] == "queued"
+
+
+def test_skipped_case_does_not_hide_the_failing_verdict(judge0, students, monkeypatch):
+    # Case 1 is still queued when case 2 fails, so fail_fast skips it
+    judge0(FakeJudge0({"1": [QUEUED], "2": [done(3, "wrong\n")]}))
+    monkeypatch.setattr(app, "get_db_connection", FakeChallengeDB([
+        {"id": 1, "stdin": "1", "expected_output": "2", "is_hidden": False},
+        {"id": 2, "stdin": "2", "expected_output": "4", "is_hidden": False},
+    ]))
+
+    result, status_code = app.run_code_submission(7, {
+        "challenge_id": 1, "code": "print(int(input()) * 2)  # fail fast", "fail_fast": True})
+
+    assert status_code == 200
+    assert [case["status"] for case in result["test_cases"]] == ["Skipped", "Wrong Answer"]
+    assert result["status"] == "Wrong Answer"
+    assert result["output"] == "wrong\n"
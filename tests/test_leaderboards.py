@@ -0,0 +1,113 @@
+"""Leaderboards rebuilds against an in-memory student_daily_progress."""
+import threading
+import time
+
+import pytest
+
+import app
+
+
+class FakeProgress:
+    """get_db_connection() stand-in whose cursor returns `rows` after `delay` seconds."""
+
+    def __init__(self, rows, delay=0.0, fail=False):
+        self.rows = rows
+        self.delay = delay
+        self.fail = fail
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self
+
+    def cursor(self, **kwargs):
+        return self
+
+    def execute(self, query, params=None):
+        with self.lock:
+            self.queries += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("database is down")
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+ROWS = [(1, "aptitude", 9, 10), (2, "aptitude", 5, 10)]
+
+
+@pytest.fixture
+def progress(monkeypatch):
+    def install(fake):
+        monkeypatch.setattr(app, "get_db_connection", fake)
+        return fake
+    return install
+
+
+def run_together(targets):
+    errors = []
+
+    def call(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=call, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_rebuilds_run_once(progress):
+    fake = progress(FakeProgress(ROWS, delay=0.1))
+    boards = app.Leaderboards(ttl=600)
+
+    errors = run_together([boards.rebuild] * 4 + [lambda: boards.top("aptitude", 10)] * 4)
+
+    assert errors == []
+    assert fake.queries == 1
+    assert boards.rebuilds == 1
+    assert [item["user_id"] for item in boards.top("aptitude", 10)] == [1, 2]
+
+
+def test_updates_during_rebuild_are_replayed(progress):
+    progress(FakeProgress(ROWS, delay=0.1))
+    boards = app.Leaderboards(ttl=600)
+
+    rebuilding = threading.Thread(target=boards.rebuild)
+    rebuilding.start()
+    time.sleep(0.05)
+    boards.record(3, "aptitude", 10, 10)
+    rebuilding.join()
+
+    assert boards.standing(3)["aptitude"]["samples"] == 10
+
+
+def test_stale_boards_serve_while_rebuilding(progress):
+    fake = progress(FakeProgress(ROWS))
+    boards = app.Leaderboards(ttl=0)
+    boards.rebuild()
+    fake.delay = 0.2
+
+    started = time.perf_counter()
+    run_together([lambda: boards.top("aptitude", 10)] * 4)
+
+    assert time.perf_counter() - started < 0.15
+    assert boards.stats()["rebuilding"]
+    time.sleep(0.3)
+    assert fake.queries == 2
+
+
+def test_failed_first_build_raises(progress):
+    progress(FakeProgress(ROWS, fail=True))
+    boards = app.Leaderboards(ttl=600)
+
+    with pytest.raises(RuntimeError):
+        boards.top("aptitude", 10)
+    assert not boards.stats()["rebuilding"]
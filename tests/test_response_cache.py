@@ -0,0 +1,61 @@
+"""cached_response validators and Cache-Control, served through /get_alumni."""
+import pytest
+
+import app
+
+# UserID, name, grad_year, company, designation, bio
+ADA = (1, "Ada", 2020, "Acme", "Engineer", "")
+
+
+class FakeDirectory:
+    def __init__(self):
+        self.rows = []
+
+    def snapshot(self):
+        return self.rows
+
+
+@pytest.fixture
+def alumni(monkeypatch):
+    monkeypatch.setattr(app, "response_cache", app.TTLCache(max_entries=10, ttl=60))
+    monkeypatch.setattr(app, "content_versions", {})
+    directory = FakeDirectory()
+    monkeypatch.setattr(app, "alumni_directory", directory)
+    return directory
+
+
+def test_alumni_directory_is_publicly_cacheable(alumni):
+    response = app.app.test_client().get("/get_alumni")
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == f"public, max-age={app.RESPONSE_MAX_AGE}"
+    assert response.headers["ETag"]
+
+
+def test_bump_in_the_same_second_moves_last_modified(alumni):
+    client = app.app.test_client()
+    first = client.get("/get_alumni")
+    since = first.headers["Last-Modified"]
+    assert client.get("/get_alumni", headers={"If-Modified-Since": since}).status_code == 304
+
+    # Several bumps within one second still each move Last-Modified forward
+    alumni.rows = [ADA]
+    app.bump_content_version("alumni")
+    second = client.get("/get_alumni", headers={"If-Modified-Since": since})
+    app.bump_content_version("alumni")
+    third = client.get("/get_alumni", headers={"If-Modified-Since": second.headers["Last-Modified"]})
+
+    assert second.status_code == 200
+    assert second.get_json()["total"] == 1
+    assert third.status_code == 200
+    assert third.headers["Last-Modified"] != second.headers["Last-Modified"]
+
+
+def test_etag_revalidation(alumni):
+    client = app.app.test_client()
+    etag = client.get("/get_alumni").headers["ETag"]
+
+    assert client.get("/get_alumni", headers={"If-None-Match": etag}).status_code == 304
+    alumni.rows = [ADA]
+    app.bump_content_version("alumni")
+    assert client.get("/get_alumni", headers={"If-None-Match": etag}).status_code == 200